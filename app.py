@@ -1,53 +1,16 @@
+import threading
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from db_config import get_connection
-
-# ----------------------------------
-# STATE NAME MAPPING (REQUIRED FOR INDIA MAP)
-# ----------------------------------
-STATE_NAME_MAPPING = {
-    "andaman-&-nicobar-islands": "Andaman and Nicobar Islands",
-    "andhra-pradesh": "Andhra Pradesh",
-    "arunachal-pradesh": "Arunachal Pradesh",
-    "assam": "Assam",
-    "bihar": "Bihar",
-    "chandigarh": "Chandigarh",
-    "chhattisgarh": "Chhattisgarh",
-    "dadra-&-nagar-haveli-&-daman-&-diu": "Dadra and Nagar Haveli and Daman and Diu",
-    "delhi": "Delhi",
-    "goa": "Goa",
-    "gujarat": "Gujarat",
-    "haryana": "Haryana",
-    "himachal-pradesh": "Himachal Pradesh",
-    "jammu-&-kashmir": "Jammu and Kashmir",
-    "jharkhand": "Jharkhand",
-    "karnataka": "Karnataka",
-    "kerala": "Kerala",
-    "ladakh": "Ladakh",
-    "lakshadweep": "Lakshadweep",
-    "madhya-pradesh": "Madhya Pradesh",
-    "maharashtra": "Maharashtra",
-    "manipur": "Manipur",
-    "meghalaya": "Meghalaya",
-    "mizoram": "Mizoram",
-    "nagaland": "Nagaland",
-    "odisha": "Odisha",
-    "puducherry": "Puducherry",
-    "punjab": "Punjab",
-    "rajasthan": "Rajasthan",
-    "sikkim": "Sikkim",
-    "tamil-nadu": "Tamil Nadu",
-    "telangana": "Telangana",
-    "tripura": "Tripura",
-    "uttar-pradesh": "Uttar Pradesh",
-    "uttarakhand": "Uttarakhand",
-    "west-bengal": "West Bengal"
-}
-
-def show_sample_data(table_name, conn):
-    query = f"SELECT * FROM {table_name} LIMIT 5"
-    df = pd.read_sql(query, conn)
+from db_config import get_data_source
+from queries import DashboardQueries, display_sql
+from map_figures import state_map_figure, prewarm_latest
+import perf
+from perf import PERF, timed
+from formatting import to_crore, to_lakh, indian_number, format_count, CRORE
+from reports import narrative as report_narrative, report_pdf, report_filename
+
+def show_sample_data(table_name, api):
+    df = api.run(f"database.sample_{table_name}")
     st.markdown("**Sample Data (First 5 Rows):**")
     st.dataframe(df)
 
@@ -74,35 +37,65 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ----------------------------------
-# HELPERS
+# DATA SOURCE
+# DATA_BACKEND=mysql: one pool per server process, shared by all
+# sessions; every query borrows a connection and hands it back.
+# Sessions are not reset on return so prepared statements stay
+# prepared between borrows.
+# DATA_BACKEND=memory: the snapshots in dataframes/, no database.
 # ----------------------------------
-def to_crore(val):
-    return round(val / 1e7, 2)
+@st.cache_resource
+def get_db_pool():
+    return get_data_source(reset_session=False)
 
-def to_lakh(val):
-    return round(val / 1e5, 2)
+api = DashboardQueries(get_db_pool())
 
 # ----------------------------------
-# DB CONNECTION
+# MAP FIGURES
+# Built maps are cached per quarter and data version (map_figures.py);
+# the latest quarter is built in the background once per process.
 # ----------------------------------
-conn = get_connection()
+@st.cache_resource
+def prewarm_maps():
+    thread = threading.Thread(target=prewarm_latest, args=(api,), daemon=True)
+    thread.start()
+    return thread
+
+prewarm_maps()
 
 # ----------------------------------
 # SIDEBAR
 # ----------------------------------
 st.sidebar.title("📊 PhonePe Pulse")
-page = st.sidebar.radio("Navigate", ["Home", "Business Case Analysis", "Reports", "Database", "About", "Creator"])
+pages = ["Home", "Business Case Analysis", "Reports", "Database", "About", "Creator"]
+# Hidden page: open the app with ?perf in the URL
+if "perf" in st.query_params:
+    pages.append("Performance")
+page = st.sidebar.radio("Navigate", pages)
 
-years = pd.read_sql("SELECT DISTINCT Year FROM aggregated_transaction ORDER BY Year", conn)["Year"]
-quarters = pd.read_sql("SELECT DISTINCT Quarter FROM aggregated_transaction ORDER BY Quarter", conn)["Quarter"]
+# Loaded once per data version; the argument only keys the cache
+@st.cache_data
+def load_filters(data_version):
+    return list(api.filters.years()["Year"]), list(api.filters.quarters()["Quarter"])
+
+years, quarters = load_filters(api.data_version())
 
 year = st.sidebar.selectbox("Year", years)
 quarter = st.sidebar.selectbox("Quarter", quarters)
 
+# ==================================
+# PAGES
+# Each interactive page is an st.fragment: its own widgets (category,
+# case, table, PDF button) rerun only that page, while the sidebar
+# widgets rerun the whole script.
+# ==================================
+
 # ==================================
 # HOME PAGE
 # ==================================
-if page == "Home":
+@st.fragment
+@perf.page("Home")
+def home_page(year, quarter):
     st.title("🇮🇳 PhonePe Pulse – India Overview")
 
     category = st.selectbox(
@@ -116,83 +109,35 @@ if page == "Home":
     if category == "Transactions":
 
         # ---------- KPI METRICS ----------
-        q = f"""
-        SELECT 
-            SUM(Transaction_Count) AS total_txn,
-            SUM(Transaction_Amount) AS total_amt
-        FROM aggregated_transaction
-        WHERE Year={year} AND Quarter={quarter}
-        """
-        m = pd.read_sql(q, conn)
+        m = api.home.totals("Transactions", year, quarter)
 
         c1, c2 = st.columns(2)
         c1.markdown(
             f"<div class='metric-box'><div class='metric-title'>Total Transactions</div>"
-            f"<div class='metric-value'>{int(m.total_txn[0]):,}</div></div>",
+            f"<div class='metric-value'>{format_count(m.Total_Count[0])}</div></div>",
             unsafe_allow_html=True
         )
         c2.markdown(
             f"<div class='metric-box'><div class='metric-title'>Total Value (₹ Cr)</div>"
-            f"<div class='metric-value'>₹ {round(m.total_amt[0]/1e7,2)}</div></div>",
+            f"<div class='metric-value'>₹ {indian_number(m.Total_Amount[0] / CRORE, 2)}</div></div>",
             unsafe_allow_html=True
         )
 
         # ---------- INDIA MAP ----------
-        map_q = f"""
-        SELECT State, SUM(Transaction_Amount) AS value
-        FROM aggregated_transaction
-        WHERE Year={year} AND Quarter={quarter}
-        GROUP BY State
-        """
-        df_map = pd.read_sql(map_q, conn)
-
-        df_map["State"] = df_map["State"].map(STATE_NAME_MAPPING)
-        df_map["Value_Display"] = df_map["value"].apply(
-            lambda x: f"₹ {round(x/1e7,2)} Cr"
-        )
-        df_map["value_plot"] = df_map["value"] / 1e7
-
-        fig = px.choropleth(
-            df_map,
-            geojson="https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/india_states.geojson",
-            featureidkey="properties.ST_NM",
-            locations="State",
-            color="value_plot",
-            hover_name="State",
-            hover_data={"Value_Display": True, "value_plot": False},
-            color_continuous_scale="Plasma",
-            title=f"State-wise Transaction Value – Q{quarter} {year}"
-        )
-        fig.update_geos(fitbounds="locations", visible=False)
-        fig.update_layout(height=650)
-        st.plotly_chart(fig, use_container_width=True)
+        fig = state_map_figure(api, "Transactions", year, quarter)
+        with timed("render", "home.state_map_chart"):
+            st.plotly_chart(fig, use_container_width=True)
 
         # ---------- TOP 10 STATES ----------
         st.subheader("🏆 Top 10 States by Transaction Value (₹ Cr)")
-        q1 = f"""
-        SELECT State, SUM(Transaction_Amount) amt
-        FROM aggregated_transaction
-        WHERE Year={year} AND Quarter={quarter}
-        GROUP BY State
-        ORDER BY amt DESC
-        LIMIT 10
-        """
-        df = pd.read_sql(q1, conn)
-        df["Amount (₹ Cr)"] = df["amt"].apply(lambda x: round(x/1e7,2))
+        df = api.home.top_states("Transactions", year, quarter)
+        df["Amount (₹ Cr)"] = to_crore(df["Total_Amount"])
         st.bar_chart(df.set_index("State")["Amount (₹ Cr)"])
 
         # ---------- TOP 10 DISTRICTS ----------
         st.subheader("🏙️ Top 10 Districts by Transaction Value (₹ Lakh)")
-        q2 = f"""
-        SELECT District, SUM(Transaction_Amount) amt
-        FROM map_transaction
-        WHERE Year={year} AND Quarter={quarter}
-        GROUP BY District
-        ORDER BY amt DESC
-        LIMIT 10
-        """
-        df2 = pd.read_sql(q2, conn)
-        df2["Amount (₹ Lakh)"] = df2["amt"].apply(lambda x: round(x/1e5,2))
+        df2 = api.home.top_districts("Transactions", year, quarter)
+        df2["Amount (₹ Lakh)"] = to_lakh(df2["Total_Amount"])
         st.table(df2[["District", "Amount (₹ Lakh)"]])
 
     # =================================================
@@ -201,42 +146,13 @@ if page == "Home":
     elif category == "Users":
 
         # ---------- INDIA MAP ----------
-        map_q = f"""
-        SELECT State, SUM(User_Count) AS value
-        FROM aggregated_user
-        WHERE Year={year} AND Quarter={quarter}
-        GROUP BY State
-        """
-        df_map = pd.read_sql(map_q, conn)
-
-        df_map["State"] = df_map["State"].map(STATE_NAME_MAPPING)
-        df_map["Value_Display"] = df_map["value"].apply(lambda x: f"{int(x):,} Users")
-
-        fig = px.choropleth(
-            df_map,
-            geojson="https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/india_states.geojson",
-            featureidkey="properties.ST_NM",
-            locations="State",
-            color="value",
-            hover_name="State",
-            hover_data={"Value_Display": True, "value": False},
-            color_continuous_scale="Purples",
-            title=f"State-wise Registered Users – Q{quarter} {year}"
-        )
-        fig.update_geos(fitbounds="locations", visible=False)
-        fig.update_layout(height=650)
-        st.plotly_chart(fig, use_container_width=True)
+        fig = state_map_figure(api, "Users", year, quarter)
+        with timed("render", "home.state_map_chart"):
+            st.plotly_chart(fig, use_container_width=True)
 
         # ---------- DEVICE DISTRIBUTION ----------
         st.subheader("📱 Device-wise User Distribution")
-        q = f"""
-        SELECT User_Device, SUM(User_Count) users
-        FROM aggregated_user
-        WHERE Year={year} AND Quarter={quarter}
-        GROUP BY User_Device
-        ORDER BY users DESC
-        """
-        df = pd.read_sql(q, conn)
+        df = api.home.devices(year, quarter)
         st.bar_chart(df.set_index("User_Device"))
 
     # =================================================
@@ -246,170 +162,102 @@ if page == "Home":
         st.subheader("🛡️ Insurance Overview")
 
         # ---------- INDIA MAP ----------
-        map_q = f"""
-        SELECT State, SUM(Insurance_Amount) AS value
-        FROM aggregated_insurance
-        WHERE Year={year} AND Quarter={quarter}
-        GROUP BY State
-        """
-        df_map = pd.read_sql(map_q, conn)
-
-        # Map PhonePe state names → GeoJSON state names
-        df_map["State"] = df_map["State"].map(STATE_NAME_MAPPING)
-
-        # Prepare display & plot values
-        df_map["value_plot"] = df_map["value"] / 1e5   # for color scale
-        df_map["Value_Display"] = df_map["value_plot"].apply(
-            lambda x: f"₹ {x:.2f} Lakh"
-        )
-
-        fig = px.choropleth(
-            df_map,
-            geojson="https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/india_states.geojson",
-            featureidkey="properties.ST_NM",
-            locations="State",
-            color="value_plot",
-            hover_name="State",
-            hover_data={
-                "Value_Display": True,
-                "value_plot": False
-            },
-            color_continuous_scale="Oranges",
-            title=f"State-wise Insurance Transaction Value – Q{quarter} {year}"
-        )
-
-        fig.update_geos(fitbounds="locations", visible=False)
-        fig.update_layout(height=650)
-
-        st.plotly_chart(fig, use_container_width=True)
+        fig = state_map_figure(api, "Insurance", year, quarter)
+        with timed("render", "home.state_map_chart"):
+            st.plotly_chart(fig, use_container_width=True)
 
         # ---------- TOP 10 STATES ----------
         st.subheader("🏥 Top 10 States by Insurance Value (₹ Lakh)")
 
-        top_q = f"""
-        SELECT State, SUM(Insurance_Amount) AS amt
-        FROM aggregated_insurance
-        WHERE Year={year} AND Quarter={quarter}
-        GROUP BY State
-        ORDER BY amt DESC
-        LIMIT 10
-        """
-        df_top = pd.read_sql(top_q, conn)
-        df_top["Amount (₹ Lakh)"] = df_top["amt"].apply(
-            lambda x: round(x / 1e5, 2)
-        )
+        df_top = api.home.top_states("Insurance", year, quarter)
+        df_top["Amount (₹ Lakh)"] = to_lakh(df_top["Total_Amount"])
 
         st.bar_chart(df_top.set_index("State")["Amount (₹ Lakh)"])
 
 
-
 # ==================================
 # BUSINESS CASE ANALYSIS (CLEAN TABS)
 # ==================================
-elif page == "Business Case Analysis":
+@st.fragment
+@perf.page("Business Case Analysis")
+def business_case_page(year, quarter):
     st.title("📘 Business Case Studies")
 
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "1️⃣ Transaction Dynamics",
-        "2️⃣ Device Dominance",
-        "3️⃣ Insurance Growth",
-        "4️⃣ Market Expansion",
-        "5️⃣ User Engagement"
-    ])
+    # Only the selected case runs its query (st.tabs would run all five)
+    case = st.radio(
+        "Case study",
+        [
+            "1️⃣ Transaction Dynamics",
+            "2️⃣ Device Dominance",
+            "3️⃣ Insurance Growth",
+            "4️⃣ Market Expansion",
+            "5️⃣ User Engagement"
+        ],
+        horizontal=True,
+        label_visibility="collapsed"
+    )
 
     # ---------- CASE 1 ----------
-    with tab1:
+    if case == "1️⃣ Transaction Dynamics":
         st.markdown("### Decoding Transaction Dynamics on PhonePe")
         st.markdown("**Table used:** `aggregated_transaction` (state + transaction type trends)")
 
-        q = f"""
-        SELECT Transaction_Type, SUM(Transaction_Count) count
-        FROM aggregated_transaction
-        WHERE Year={year} AND Quarter={quarter}
-        GROUP BY Transaction_Type
-        """
-        st.code(q)
-        df = pd.read_sql(q, conn)
+        st.code(display_sql("business.transaction_types"))
+        df = api.business.transaction_types(year, quarter)
         st.dataframe(df)
         st.bar_chart(df.set_index("Transaction_Type"))
         
 
     # ---------- CASE 2 ----------
-    with tab2:
+    elif case == "2️⃣ Device Dominance":
         st.markdown("### Device Dominance and User Engagement Analysis")
         st.markdown("**Table used:** `aggregated_user` (device-wise user distribution)")
 
-        q = f"""
-        SELECT User_Device, SUM(User_Count) users
-        FROM aggregated_user
-        WHERE Year={year} AND Quarter={quarter}
-        GROUP BY User_Device
-        ORDER BY users DESC
-        """
-        st.code(q)
-        df = pd.read_sql(q, conn)
+        st.code(display_sql("home.devices"))
+        df = api.home.devices(year, quarter)
         st.dataframe(df)
         st.bar_chart(df.set_index("User_Device"))
         
 
     # ---------- CASE 3 ----------
-    with tab3:
+    elif case == "3️⃣ Insurance Growth":
         st.markdown("### Insurance Penetration and Growth Potential Analysis")
         st.markdown("**Table used:** `aggregated_insurance` (state-level insurance value)")
 
-        q = f"""
-        SELECT State, SUM(Insurance_Amount) amt
-        FROM aggregated_insurance
-        WHERE Year={year} AND Quarter={quarter}
-        GROUP BY State
-        ORDER BY amt DESC
-        """
-        st.code(q)
-        df = pd.read_sql(q, conn)
-        df["₹ Lakh"] = df["amt"].apply(to_lakh)
+        st.code(display_sql("business.insurance_states"))
+        df = api.business.insurance_states(year, quarter)
+        df["₹ Lakh"] = to_lakh(df["amt"])
         st.dataframe(df[["State", "₹ Lakh"]])
         
 
     # ---------- CASE 4 ----------
-    with tab4:
+    elif case == "4️⃣ Market Expansion":
         st.markdown("### Transaction Analysis for Market Expansion")
         st.markdown("**Table used:** `map_transaction` (district-level transaction value)")
 
-        q = f"""
-        SELECT District, SUM(Transaction_Amount) amt
-        FROM map_transaction
-        WHERE Year={year} AND Quarter={quarter}
-        GROUP BY District
-        ORDER BY amt DESC
-        LIMIT 10
-        """
-        st.code(q)
-        df = pd.read_sql(q, conn)
-        df["₹ Lakh"] = df["amt"].apply(to_lakh)
+        st.code(display_sql("business.transaction_districts"))
+        df = api.business.transaction_districts(year, quarter)
+        df["₹ Lakh"] = to_lakh(df["amt"])
         st.table(df[["District", "₹ Lakh"]])
         
 
     # ---------- CASE 5 ----------
-    with tab5:
+    elif case == "5️⃣ User Engagement":
         st.markdown("### User Engagement and Growth Strategy")
         st.markdown("**Table used:** `map_user` (district-wise user count)")
 
-        q = f"""
-        SELECT District, User_Count
-        FROM map_user
-        WHERE Year={year} AND Quarter={quarter}
-        ORDER BY User_Count DESC
-        LIMIT 10
-        """
-        st.code(q)
-        df = pd.read_sql(q, conn)
+        st.code(display_sql("business.user_districts"))
+        df = api.business.user_districts(year, quarter)
         st.table(df)
         
 
+
 # ==================================
 # REPORTS PAGE (REAL PDF REPORT)
 # ==================================
-elif page == "Reports":
+@st.fragment
+@perf.page("Reports")
+def reports_page(year, quarter):
     st.title("📄 Quarterly Analytics Report")
 
     st.markdown("""
@@ -438,233 +286,180 @@ based on **PhonePe Pulse data**, similar to real-world analytics reports.
 
         st.subheader("🔍 Transaction Summary")
 
-        summary_query = f"""
-        SELECT 
-            SUM(Transaction_Count) AS total_txn,
-            SUM(Transaction_Amount) AS total_amt
-        FROM aggregated_transaction
-        WHERE Year={year} AND Quarter={quarter}
-        """
-        summary_df = pd.read_sql(summary_query, conn)
+        summary_df = api.home.totals("Transactions", year, quarter).rename(
+            columns={"Total_Count": "total_txn", "Total_Amount": "total_amt"}
+        )
 
         st.dataframe(summary_df)
 
-        top_states_query = f"""
-        SELECT State, SUM(Transaction_Amount) AS amt
-        FROM aggregated_transaction
-        WHERE Year={year} AND Quarter={quarter}
-        GROUP BY State
-        ORDER BY amt DESC
-        LIMIT 10
-        """
-        top_states_df = pd.read_sql(top_states_query, conn)
+        top_states_df = api.home.top_states("Transactions", year, quarter)[["State", "Total_Amount"]].rename(
+            columns={"Total_Amount": "amt"}
+        )
         st.subheader("🏆 Top 10 States by Transaction Value")
         st.dataframe(top_states_df)
 
-        narrative = (
-            f"In Q{quarter} {year}, PhonePe recorded "
-            f"{int(summary_df.total_txn[0]):,} transactions "
-            f"with a total value of ₹{round(summary_df.total_amt[0]/1e7,2)} Cr. "
-            "Transaction activity was concentrated in top-performing states."
-        )
+        narrative = report_narrative("Transactions", year, quarter,
+                                     summary_df.total_txn[0], summary_df.total_amt[0])
 
     elif report_category == "Users":
 
         st.subheader("🔍 User Engagement Summary")
 
-        summary_query = f"""
-        SELECT SUM(User_Count) AS total_users
-        FROM aggregated_user
-        WHERE Year={year} AND Quarter={quarter}
-        """
-        summary_df = pd.read_sql(summary_query, conn)
+        summary_df = api.home.totals("Users", year, quarter)[["Total_Count"]].rename(
+            columns={"Total_Count": "total_users"}
+        )
         st.dataframe(summary_df)
 
-        device_query = f"""
-        SELECT User_Device, SUM(User_Count) AS users
-        FROM aggregated_user
-        WHERE Year={year} AND Quarter={quarter}
-        GROUP BY User_Device
-        ORDER BY users DESC
-        """
-        device_df = pd.read_sql(device_query, conn)
+        device_df = api.home.devices(year, quarter)
         st.subheader("📱 Device-wise User Distribution")
         st.dataframe(device_df)
 
-        narrative = (
-            f"In Q{quarter} {year}, PhonePe had "
-            f"{int(summary_df.total_users[0]):,} registered users. "
-            "Android devices continued to dominate user adoption."
-        )
+        narrative = report_narrative("Users", year, quarter, summary_df.total_users[0], None)
 
     else:  # Insurance
 
         st.subheader("🔍 Insurance Adoption Summary")
 
-        summary_query = f"""
-        SELECT COALESCE(SUM(Insurance_Amount), 0) AS total_amt
-        FROM aggregated_insurance
-        WHERE Year = {year} AND Quarter = {quarter}
-
-
-        """
-        summary_df = pd.read_sql(summary_query, conn)
+        summary_df = api.home.totals("Insurance", year, quarter)[["Total_Amount"]].rename(
+            columns={"Total_Amount": "total_amt"}
+        )
         st.dataframe(summary_df)
 
-        top_states_query = f"""
-        SELECT State, SUM(Insurance_Amount) AS amt
-        FROM aggregated_insurance
-        WHERE Year={year} AND Quarter={quarter}
-        GROUP BY State
-        ORDER BY amt DESC
-        LIMIT 10
-        """
-        top_states_df = pd.read_sql(top_states_query, conn)
+        top_states_df = api.home.top_states("Insurance", year, quarter)[["State", "Total_Amount"]].rename(
+            columns={"Total_Amount": "amt"}
+        )
         st.subheader("🏥 Top 10 States by Insurance Value")
         st.dataframe(top_states_df)
 
-        narrative = (
-            f"In Q{quarter} {year}, insurance transactions reached "
-            f"₹{round(summary_df.total_amt[0]/1e5,2)} Lakh in value. "
-            "Adoption remains concentrated in select states."
-        )
+        narrative = report_narrative("Insurance", year, quarter, None, summary_df.total_amt[0])
 
     # ---------------------------
     # GENERATE PDF
     # ---------------------------
+    # Rendered in memory and cached per quarter and data version
+    # (reports.py), so repeat downloads do not render again
     if st.button("📥 Generate & Download PDF Report"):
-        from reportlab.lib.pagesizes import A4
-        from reportlab.pdfgen import canvas
-        import tempfile
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            c = canvas.Canvas(tmp.name, pagesize=A4)
-            text = c.beginText(40, 800)
-            text.setFont("Helvetica", 11)
-
-            text.textLine("PhonePe Pulse – Quarterly Analytics Report")
-            text.textLine("-" * 50)
-            text.textLine(f"Category: {report_category}")
-            text.textLine(f"Year: {year}, Quarter: Q{quarter}")
-            text.textLine("")
-            text.textLine("Executive Summary:")
-            text.textLine(narrative)
-            text.textLine("")
-            text.textLine("This report is generated automatically using")
-            text.textLine("MySQL + Python + Streamlit from PhonePe Pulse data.")
-
-            c.drawText(text)
-            c.showPage()
-            c.save()
-
-            with open(tmp.name, "rb") as f:
-                st.download_button(
-                    "⬇ Download PDF",
-                    f,
-                    file_name=f"PhonePe_{report_category}_Q{quarter}_{year}.pdf",
-                    mime="application/pdf"
-                )
+        st.download_button(
+            "⬇ Download PDF",
+            report_pdf(api, report_category, year, quarter, narrative),
+            file_name=report_filename(report_category, year, quarter),
+            mime="application/pdf"
+        )
+
+
 # ==================================
 # DATABASE PAGE
 # ==================================
-elif page == "Database":
+@st.fragment
+@perf.page("Database")
+def database_page():
     st.title("🗄️ Database Design & Tables")
 
     st.markdown("""
 This project uses a **MySQL relational database** designed for analytical workloads.
 Each table serves a specific purpose in enabling multi-level insights.
+State and district names are stored once in the `dim_state` and `dim_district`
+dimension tables; the fact tables below reference them by `State_ID` / `District_ID`.
 """)
 
-    tabs = st.tabs([
-        "Aggregated Transaction",
-        "Aggregated User",
-        "Aggregated Insurance",
-        "Map Transaction",
-        "Map User",
-        "Map Insurance",
-        "Top Transaction",
-        "Top User",
-        "Top Insurance"
-    ])
+    # Only the selected table is sampled (st.tabs would query all nine)
+    table_tab = st.radio(
+        "Table",
+        [
+            "Aggregated Transaction",
+            "Aggregated User",
+            "Aggregated Insurance",
+            "Map Transaction",
+            "Map User",
+            "Map Insurance",
+            "Top Transaction",
+            "Top User",
+            "Top Insurance"
+        ],
+        horizontal=True,
+        label_visibility="collapsed"
+    )
 
     # ------------------------------------------------
-    with tabs[0]:
+    if table_tab == "Aggregated Transaction":
         st.subheader("📊 aggregated_transaction")
         st.markdown("""
 **Purpose:** State-level transaction metrics by year, quarter, and transaction type.
 """)
-        show_sample_data("aggregated_transaction", conn)
+        show_sample_data("aggregated_transaction", api)
 
     # ------------------------------------------------
-    with tabs[1]:
+    elif table_tab == "Aggregated User":
         st.subheader("👥 aggregated_user")
         st.markdown("""
 **Purpose:** Device-wise user distribution at state level.
 """)
-        show_sample_data("aggregated_user", conn)
+        show_sample_data("aggregated_user", api)
 
     # ------------------------------------------------
-    with tabs[2]:
+    elif table_tab == "Aggregated Insurance":
         st.subheader("🛡️ aggregated_insurance")
         st.markdown("""
 **Purpose:** State-level insurance transaction metrics.
 """)
-        show_sample_data("aggregated_insurance", conn)
+        show_sample_data("aggregated_insurance", api)
 
     # ------------------------------------------------
-    with tabs[3]:
+    elif table_tab == "Map Transaction":
         st.subheader("🗺️ map_transaction")
         st.markdown("""
 **Purpose:** District-level transaction insights.
 """)
-        show_sample_data("map_transaction", conn)
+        show_sample_data("map_transaction", api)
 
     # ------------------------------------------------
-    with tabs[4]:
+    elif table_tab == "Map User":
         st.subheader("👤 map_user")
         st.markdown("""
 **Purpose:** District-wise registered user counts.
 """)
-        show_sample_data("map_user", conn)
+        show_sample_data("map_user", api)
 
     # ------------------------------------------------
-    with tabs[5]:
+    elif table_tab == "Map Insurance":
         st.subheader("🛡️ map_insurance")
         st.markdown("""
 **Purpose:** District-level insurance adoption data.
 """)
-        show_sample_data("map_insurance", conn)
+        show_sample_data("map_insurance", api)
 
     # ------------------------------------------------
-    with tabs[6]:
+    elif table_tab == "Top Transaction":
         st.subheader("🏆 top_transaction")
         st.markdown("""
 **Purpose:** Top-performing regions based on transaction value.
 """)
-        show_sample_data("top_transaction", conn)
+        show_sample_data("top_transaction", api)
 
     # ------------------------------------------------
-    with tabs[7]:
+    elif table_tab == "Top User":
         st.subheader("👥 top_user")
         st.markdown("""
 **Purpose:** Regions with highest registered users.
 """)
-        show_sample_data("top_user", conn)
+        show_sample_data("top_user", api)
 
     # ------------------------------------------------
-    with tabs[8]:
+    elif table_tab == "Top Insurance":
         st.subheader("🛡️ top_insurance")
         st.markdown("""
 **Purpose:** Regions leading in insurance transactions.
 """)
-        show_sample_data("top_insurance", conn)
+        show_sample_data("top_insurance", api)
 
     st.success("✅ Each table is validated with live sample data from the database.")
 
+
 # ==================================
 # ABOUT PAGE
 # ==================================
-elif page == "About":
+@perf.page("About")
+def about_page():
     st.title("ℹ️ About PhonePe Pulse")
 
     st.markdown("""
@@ -777,10 +572,12 @@ that mirrors real-world data science workflows:
 - Plotly for rich visualizations  
 """)
 
+
 # ==================================
 # CREATOR PAGE
 # ==================================
-elif page == "Creator":
+@perf.page("Creator")
+def creator_page():
 
     # ---------- HEADER ----------
     st.markdown("""
@@ -897,3 +694,57 @@ elif page == "Creator":
 
    
     st.success("✨ Thank you for exploring this project!")
+
+
+# ==================================
+# PERFORMANCE PAGE (hidden, ?perf)
+# Query, figure, render and page timings of this server process
+# (perf.py). Set PERF_LOG to also append every event to a JSON-lines
+# file.
+# ==================================
+@st.fragment
+def performance_page():
+    st.title("⏱️ Performance")
+
+    summary = PERF.summary()
+    if summary.empty:
+        st.info("No events recorded yet. Browse a few pages first.")
+        return
+
+    st.markdown(f"**{len(PERF.events):,} events** recorded in this server process.")
+    st.dataframe(summary, use_container_width=True)
+
+    with st.expander("Query SQL"):
+        events = pd.DataFrame(PERF.snapshot())
+        if "sql" in events:
+            st.dataframe(events.dropna(subset=["sql"])[["name", "sql"]].drop_duplicates("name"))
+
+    c1, c2 = st.columns(2)
+    c1.download_button(
+        "⬇ Export events (JSON lines)",
+        PERF.to_jsonl(),
+        file_name="phonepe_perf_events.jsonl",
+        mime="application/x-ndjson"
+    )
+    if c2.button("🧹 Clear events"):
+        PERF.clear()
+        st.rerun(scope="fragment")
+
+
+# ==================================
+# PAGE DISPATCH
+# ==================================
+if page == "Home":
+    home_page(year, quarter)
+elif page == "Business Case Analysis":
+    business_case_page(year, quarter)
+elif page == "Reports":
+    reports_page(year, quarter)
+elif page == "Database":
+    database_page()
+elif page == "About":
+    about_page()
+elif page == "Creator":
+    creator_page()
+elif page == "Performance":
+    performance_page()
@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import argparse
+import subprocess
+
+import numpy as np
+
+from pulse_ingestion import build_all, write_csvs
+from snapshots import write_all_snapshots
+from queries import QUERIES, DashboardQueries
+from query_cache import QueryCache
+from rollups import CATEGORIES
+from perf import PERF
+from synthetic_pulse import SCALES, generate
+
+# -----------------------------------
+# BENCHMARK RUNNER
+# Times every stage of the pipeline against a synthetic_pulse.py tree:
+#   generate -> ingest (build_all) -> write_csv -> snapshots
+#   -> mysql_load (data_loader + rollups, only with --mysql)
+#   -> memory_load, and every named dashboard query (cache disabled)
+# Each run is appended as one JSON line to benchmarks/results.jsonl and
+# compared with the previous run of the same scale and backend.
+# -----------------------------------
+BENCH_DIR = "benchmarks"
+RESULTS_PATH = os.path.join(BENCH_DIR, "results.jsonl")
+REGRESSION_THRESHOLD = 0.20   # 20% slower than the previous run
+REGRESSION_MIN_MS = 1.0       # and at least this much, so sub-ms noise is ignored
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def count_files(data_dir):
+    return sum(len(files) for _, _, files in os.walk(data_dir))
+
+
+class Stages:
+    def __init__(self):
+        self.ms = {}
+
+    def run(self, name, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.ms[name] = round((time.perf_counter() - start) * 1000, 1)
+        print(f"⏱️ {name}: {self.ms[name] / 1000:.2f}s")
+        return result
+
+
+# -----------------------------------
+# QUERIES
+# -----------------------------------
+def sample_periods(api, count):
+    years = api.filters.years().Year.tolist()
+    quarters = api.filters.quarters().Quarter.tolist()
+    periods = [(int(y), int(q)) for y in years for q in quarters]
+    if count and len(periods) > count:
+        picks = np.linspace(0, len(periods) - 1, count).round().astype(int)
+        periods = [periods[i] for i in picks]
+    return periods
+
+
+def query_params(names, periods):
+    for year, quarter in periods:
+        for category in CATEGORIES:
+            values = {"year": year, "quarter": quarter, "category": category}
+            yield tuple(values[n] for n in names)
+
+
+def time_queries(source, periods=12, repeat=3):
+    # A zero-size cache keeps every call a real execution, while still
+    # going through DashboardQueries so perf.py records each one
+    api = DashboardQueries(source, QueryCache(maxsize=0))
+    picked = sample_periods(api, periods)
+
+    PERF.clear()
+    for name, (_, param_names) in QUERIES.items():
+        seen = set()
+        for params in query_params(param_names, picked):
+            if params in seen:
+                continue
+            seen.add(params)
+            for _ in range(repeat):
+                api.run(name, *params)
+
+    summary = PERF.summary()
+    summary = summary[summary["stage"] == "query"]
+    return {
+        row.name: {"calls": int(row.calls), "p50_ms": row.p50_ms, "p95_ms": row.p95_ms,
+                   "avg_rows": row.avg_rows}
+        for row in summary.itertuples()
+    }
+
+
+# -----------------------------------
+# RESULTS
+# -----------------------------------
+def previous_result(scale, backend, path=RESULTS_PATH):
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            run = json.loads(line)
+            if run["scale"] == scale and run["backend"] == backend:
+                previous = run
+    return previous
+
+
+def regressions(current, previous, threshold=REGRESSION_THRESHOLD, min_ms=REGRESSION_MIN_MS):
+    # [(what, previous ms, current ms)] for stages and query p95s that got
+    # more than threshold slower
+    pairs = [(f"stage {name}", previous["stages"].get(name), ms) for name, ms in current["stages"].items()]
+    pairs += [(f"query {name}", previous["queries"].get(name, {}).get("p95_ms"), q["p95_ms"])
+              for name, q in current["queries"].items()]
+    return [(what, before, after) for what, before, after in pairs
+            if before and after > before * (1 + threshold) and after - before >= min_ms]
+
+
+def save_result(result, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result) + "\n")
+
+
+def run_benchmark(scale, data_dir=None, out_dir=None, workers=None, mysql=False,
+                  periods=12, repeat=3, regenerate=False):
+    data_dir = data_dir or os.path.join(BENCH_DIR, "data", f"x{scale}")
+    out_dir = out_dir or os.path.join(BENCH_DIR, "out", f"x{scale}")
+    stages = Stages()
+
+    if regenerate or not os.path.isdir(data_dir):
+        stages.run("generate", generate, data_dir, scale)
+
+    frames = stages.run("ingest", build_all, data_dir, workers=workers)
+    stages.run("write_csv", write_csvs, frames, out_dir)
+    stages.run("snapshots", write_all_snapshots, out_dir)
+
+    if mysql:
+        from data_loader import load_all_atomic
+        from rollups import build_rollups
+        from db_config import get_pool
+
+        stages.run("mysql_load", load_all_atomic, source_dir=out_dir, workers=workers)
+        stages.run("rollups", build_rollups)
+        source = get_pool(reset_session=False)
+    else:
+        from memory_backend import MemoryStore
+        source = stages.run("memory_load", MemoryStore, out_dir)
+
+    queries = time_queries(source, periods, repeat)
+
+    return {
+        "ts": round(time.time(), 3),
+        "commit": git_commit(),
+        "scale": scale,
+        "backend": "mysql" if mysql else "memory",
+        "files": count_files(data_dir),
+        "rows": {table_name: len(df) for table_name, df in frames.items()},
+        "stages": stages.ms,
+        "queries": queries,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingestion, loading and dashboard queries "
+                                                 "on a synthetic Pulse dataset")
+    parser.add_argument("--scale", type=int, choices=list(SCALES), default=10)
+    parser.add_argument("--data-dir", default=None, help="Default: benchmarks/data/x<scale>")
+    parser.add_argument("--out-dir", default=None, help="Default: benchmarks/out/x<scale>")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--mysql", action="store_true",
+                        help="Load into the MySQL database from .env (replaces its tables!) "
+                             "and query it, instead of the in-memory backend")
+    parser.add_argument("--periods", type=int, default=12,
+                        help="Quarters sampled for the query timings (0 = all)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--regenerate", action="store_true")
+    parser.add_argument("--results", default=RESULTS_PATH)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.scale, args.data_dir, args.out_dir, args.workers, args.mysql,
+                           args.periods, args.repeat, args.regenerate)
+
+    print(f"\n📊 x{result['scale']} {result['backend']}: {result['files']:,} files, "
+          f"{sum(result['rows'].values()):,} rows")
+    for name, q in sorted(result["queries"].items(), key=lambda item: -item[1]["p95_ms"]):
+        print(f"   {name:<40} p50 {q['p50_ms']:>9.3f} ms   p95 {q['p95_ms']:>9.3f} ms")
+
+    previous = previous_result(result["scale"], result["backend"], args.results)
+    if previous:
+        slower = regressions(result, previous)
+        for what, before, after in slower:
+            print(f"⚠️ {what}: {before:.1f} ms -> {after:.1f} ms")
+        if not slower:
+            print(f"✅ No regressions against {previous['commit']}")
+
+    if not args.no_save:
+        save_result(result, args.results)
+        print(f"💾 Saved to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
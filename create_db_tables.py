@@ -1,136 +1,223 @@
-from db_config import get_connection
-
-conn = get_connection()
-cursor = conn.cursor()
-
-# -------------------------------
-# Create Database
-# -------------------------------
-cursor.execute("CREATE DATABASE IF NOT EXISTS phonepe_db")
-cursor.execute("USE phonepe_db")
-
-# -------------------------------
-# AGGREGATED TABLES
-# -------------------------------
+import argparse
 
-# aggregated_transaction
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS aggregated_transaction (
-    State VARCHAR(100),
-    Year INT,
-    Quarter INT,
-    Transaction_Type VARCHAR(100),
-    Transaction_Count BIGINT,
-    Transaction_Amount DOUBLE
-)
-""")
-
-# aggregated_insurance
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS aggregated_insurance (
-    State VARCHAR(100),
-    Year INT,
-    Quarter INT,
-    Insurance_Count BIGINT,
-    Insurance_Amount DOUBLE
-)
-""")
-
-# aggregated_user
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS aggregated_user (
-    State VARCHAR(100),
-    Year INT,
-    Quarter INT,
-    User_Device VARCHAR(100),
-    User_Count BIGINT,
-    User_Share DOUBLE
-)
-""")
-
-# -------------------------------
-# MAP TABLES
-# -------------------------------
-
-# map_transaction
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS map_transaction (
-    State VARCHAR(100),
-    Year INT,
-    Quarter INT,
-    District VARCHAR(100),
-    Transaction_Count BIGINT,
-    Transaction_Amount DOUBLE
-)
-""")
-
-# map_insurance
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS map_insurance (
-    State VARCHAR(100),
-    Year INT,
-    Quarter INT,
-    District VARCHAR(100),
-    Insurance_Count BIGINT,
-    Insurance_Amount DOUBLE
-)
-""")
-
-# map_user
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS map_user (
-    State VARCHAR(100),
-    Year INT,
-    Quarter INT,
-    District VARCHAR(100),
-    User_Count BIGINT
-)
-""")
+from db_config import get_connection
+from db_indexes import ensure_indexes
+from db_partitions import PARTITIONED_TABLES, partition_clause, partition_table
+from pulse_ingestion import table_columns
+from dimensions import create_dimension_tables, ensure_dimensions, db_columns
+from rollups import create_rollup_tables
+from query_cache import create_data_version_table
 
 # -------------------------------
-# TOP TABLES
+# TABLE DEFINITIONS
+# table name -> column definitions
+# States and districts are integer keys into dim_state / dim_district
+# (see dimensions.py)
 # -------------------------------
-
-# top_transaction
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS top_transaction (
-    State VARCHAR(100),
-    Year INT,
-    Quarter INT,
-    District VARCHAR(100),
-    Transaction_Count BIGINT,
-    Transaction_Amount DOUBLE
-)
-""")
-
-# top_insurance
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS top_insurance (
-    State VARCHAR(100),
-    Year INT,
-    Quarter INT,
-    District VARCHAR(100),
-    Insurance_Count BIGINT,
-    Insurance_Amount DOUBLE
-)
-""")
-
-# top_user
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS top_user (
-    State VARCHAR(100),
-    Year INT,
-    Quarter INT,
-    District VARCHAR(100),
-    Registered_Users BIGINT
-)
-""")
+TABLE_COLUMNS = {
+    # AGGREGATED TABLES
+    "aggregated_transaction": [
+        "State_ID SMALLINT",
+        "Year INT",
+        "Quarter INT",
+        "Transaction_Type VARCHAR(100)",
+        "Transaction_Count BIGINT",
+        "Transaction_Amount DOUBLE",
+    ],
+    "aggregated_insurance": [
+        "State_ID SMALLINT",
+        "Year INT",
+        "Quarter INT",
+        "Insurance_Count BIGINT",
+        "Insurance_Amount DOUBLE",
+    ],
+    "aggregated_user": [
+        "State_ID SMALLINT",
+        "Year INT",
+        "Quarter INT",
+        "User_Device VARCHAR(100)",
+        "User_Count BIGINT",
+        "User_Share DOUBLE",
+    ],
+
+    # MAP TABLES
+    "map_transaction": [
+        "State_ID SMALLINT",
+        "Year INT",
+        "Quarter INT",
+        "District_ID INT",
+        "Transaction_Count BIGINT",
+        "Transaction_Amount DOUBLE",
+    ],
+    "map_insurance": [
+        "State_ID SMALLINT",
+        "Year INT",
+        "Quarter INT",
+        "District_ID INT",
+        "Insurance_Count BIGINT",
+        "Insurance_Amount DOUBLE",
+    ],
+    "map_user": [
+        "State_ID SMALLINT",
+        "Year INT",
+        "Quarter INT",
+        "District_ID INT",
+        "User_Count BIGINT",
+    ],
+
+    # TOP TABLES
+    "top_transaction": [
+        "State_ID SMALLINT",
+        "Year INT",
+        "Quarter INT",
+        "District_ID INT",
+        "Transaction_Count BIGINT",
+        "Transaction_Amount DOUBLE",
+    ],
+    "top_insurance": [
+        "State_ID SMALLINT",
+        "Year INT",
+        "Quarter INT",
+        "District_ID INT",
+        "Insurance_Count BIGINT",
+        "Insurance_Amount DOUBLE",
+    ],
+    "top_user": [
+        "State_ID SMALLINT",
+        "Year INT",
+        "Quarter INT",
+        "District_ID INT",
+        "Registered_Users BIGINT",
+    ],
+}
 
 # -------------------------------
-# Commit & Close
+# NATURAL PRIMARY KEYS
+# One row per state/quarter and transaction type, device or district.
+# They also make InnoDB cluster each quarter's rows together.
 # -------------------------------
-conn.commit()
-cursor.close()
-conn.close()
-
-print("✅ phonepe_db and all 9 tables created successfully")
+PRIMARY_KEYS = {
+    "aggregated_transaction": ["State_ID", "Year", "Quarter", "Transaction_Type"],
+    "aggregated_insurance": ["State_ID", "Year", "Quarter"],
+    "aggregated_user": ["State_ID", "Year", "Quarter", "User_Device"],
+    "map_transaction": ["State_ID", "Year", "Quarter", "District_ID"],
+    "map_insurance": ["State_ID", "Year", "Quarter", "District_ID"],
+    "map_user": ["State_ID", "Year", "Quarter", "District_ID"],
+    "top_transaction": ["State_ID", "Year", "Quarter", "District_ID"],
+    "top_insurance": ["State_ID", "Year", "Quarter", "District_ID"],
+    "top_user": ["State_ID", "Year", "Quarter", "District_ID"],
+}
+
+
+def primary_key(table_name):
+    # Staging/helper copies such as map_user__staging share their table's key
+    return PRIMARY_KEYS[table_name.split("__")[0]]
+
+
+def create_table_sql(table_name, target_name=None, partitioned=False):
+    definitions = TABLE_COLUMNS[table_name] + [f"PRIMARY KEY ({', '.join(PRIMARY_KEYS[table_name])})"]
+    body = ",\n    ".join(definitions)
+    sql = f"CREATE TABLE IF NOT EXISTS {target_name or table_name} (\n    {body}\n)"
+    if partitioned:
+        sql += "\n" + partition_clause()
+    return sql
+
+
+def is_legacy_table(cursor, table_name):
+    # Tables from before the star schema still carry the State slug column
+    cursor.execute("""
+    SELECT COUNT(*) FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'State'
+    """, (table_name,))
+    return cursor.fetchone()[0] > 0
+
+
+def migrate_legacy_table(cursor, table_name):
+    # Rebuilds a slug-keyed table into the keyed star layout. Older tables
+    # may also hold duplicated rows from repeated loads; INSERT IGNORE keeps
+    # one row per primary key.
+    columns = table_columns(table_name)
+    has_district = "District" in columns
+
+    cursor.execute(f"SELECT DISTINCT State{', District' if has_district else ''} FROM {table_name}")
+    pairs = cursor.fetchall()
+    ensure_dimensions(cursor, {row[0] for row in pairs}, pairs if has_district else ())
+
+    select = []
+    for col in columns:
+        if col == "State":
+            select.append("s.State_ID")
+        elif col == "District":
+            select.append("d.District_ID")
+        else:
+            select.append(f"t.{col}")
+    joins = "JOIN dim_state s ON s.State = t.State"
+    if has_district:
+        joins += " JOIN dim_district d ON d.State_ID = s.State_ID AND d.District = t.District"
+
+    rebuilt = f"{table_name}__star"
+    cursor.execute(f"DROP TABLE IF EXISTS {rebuilt}")
+    cursor.execute(create_table_sql(table_name, rebuilt))
+    cursor.execute(f"""
+    INSERT IGNORE INTO {rebuilt} ({', '.join(db_columns(columns))})
+    SELECT {', '.join(select)} FROM {table_name} t {joins}
+    """)
+    cursor.execute(f"RENAME TABLE {table_name} TO {table_name}__legacy, {rebuilt} TO {table_name}")
+    cursor.execute(f"DROP TABLE {table_name}__legacy")
+    print(f"⭐ Migrated {table_name} to State_ID/District_ID keys")
+
+
+def create_tables(cursor, partition=False):
+    create_dimension_tables(cursor)
+    for table_name in TABLE_COLUMNS:
+        partitioned = partition and table_name in PARTITIONED_TABLES
+        cursor.execute(create_table_sql(table_name, partitioned=partitioned))
+        if is_legacy_table(cursor, table_name):
+            migrate_legacy_table(cursor, table_name)
+        if partitioned:
+            partition_table(cursor, table_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create phonepe_db and its tables")
+    parser.add_argument("--partition", action="store_true",
+                        help=f"RANGE-partition {', '.join(PARTITIONED_TABLES)} by Year and Quarter")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    # -------------------------------
+    # Create Database
+    # -------------------------------
+    cursor.execute("CREATE DATABASE IF NOT EXISTS phonepe_db")
+    cursor.execute("USE phonepe_db")
+
+    # -------------------------------
+    # DIMENSION, AGGREGATED, MAP & TOP TABLES
+    # -------------------------------
+    create_tables(cursor, args.partition)
+
+    # -------------------------------
+    # Dashboard covering indexes
+    # -------------------------------
+    ensure_indexes(cursor)
+
+    # -------------------------------
+    # Dashboard rollup tables (filled by the loaders)
+    # -------------------------------
+    create_rollup_tables(cursor)
+    create_data_version_table(cursor)
+
+    # -------------------------------
+    # Commit & Close
+    # -------------------------------
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+    print("✅ phonepe_db, its dimension tables and all 9 fact tables created successfully")
+
+
+if __name__ == "__main__":
+    main()
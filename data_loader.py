@@ -1,107 +1,301 @@
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
-from db_config import get_connection
+import mysql.connector
+from db_config import get_connection, get_pool
+from pulse_ingestion import OUTPUT_DIR, TABLES, table_columns
+from create_db_tables import primary_key
+from db_partitions import PARTITIONED_TABLES, ensure_partitions
+from dimensions import encode_rows, ensure_dimensions
+from rollups import build_rollups
+
+LOAD_MODES = ["bulk", "batch", "row"]
+DEFAULT_BATCH_SIZE = 5000
+
 
 # -----------------------------------
 # Helper function to load CSV to MySQL
+# mode="bulk"  -> LOAD DATA LOCAL INFILE, falls back to "batch"
+#                 when the server or client does not allow it
+# mode="batch" -> multi-row INSERTs of batch_size rows each
+# mode="row"   -> one INSERT per row (the original behaviour)
+# A .parquet snapshot path is read directly and always uses INSERTs.
+# conn can be a pooled connection; closing it hands it back to the pool.
 # -----------------------------------
-def load_csv_to_mysql(csv_path, table_name, columns):
-    df = pd.read_csv(csv_path)
+def load_csv_to_mysql(csv_path, table_name, columns, mode="bulk", batch_size=DEFAULT_BATCH_SIZE,
+                      conn=None):
+    start = time.perf_counter()
 
-    conn = get_connection()
+    conn = conn or get_connection(allow_local_infile=(mode == "bulk"))
     cursor = conn.cursor()
     cursor.execute("USE phonepe_db")
 
+    try:
+        if table_name.split("__")[0] in PARTITIONED_TABLES:
+            ensure_partitions(cursor, table_name, set(read_years(csv_path)))
+
+        rows = None
+        if mode == "bulk" and csv_path.endswith(".parquet"):
+            mode = "batch"
+        if mode == "bulk":
+            rows = load_infile(cursor, csv_path, table_name, columns)
+            if rows is None:
+                mode = "batch"
+        if rows is None:
+            if csv_path.endswith(".parquet"):
+                df = pd.read_parquet(csv_path, columns=columns)
+            else:
+                df = pd.read_csv(csv_path, float_precision="round_trip")
+            rows = insert_rows(cursor, table_name, columns, dataframe_rows(df, columns),
+                               batch_size if mode == "batch" else 1)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Loaded {rows} rows into {table_name} "
+          f"[{mode}] in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+    return rows
+
+
+def read_years(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=["Year"])["Year"].unique().tolist()
+    return pd.read_csv(path, usecols=["Year"])["Year"].unique().tolist()
+
+
+def insert_rows(cursor, table_name, columns, rows, batch_size):
+    # Rows come in with State/District slugs and go out with their keys
+    columns, rows = encode_rows(cursor, columns, rows)
+
     placeholders = ", ".join(["%s"] * len(columns))
     column_names = ", ".join(columns)
 
+    # Upsert on the natural primary key, so loading the same rows twice
+    # updates them instead of duplicating them
+    key = primary_key(table_name)
+    updates = ", ".join(f"{col} = VALUES({col})" for col in columns if col not in key)
+
     insert_query = f"""
     INSERT INTO {table_name} ({column_names})
     VALUES ({placeholders})
+    ON DUPLICATE KEY UPDATE {updates}
     """
 
-    for _, row in df.iterrows():
-        cursor.execute(insert_query, tuple(row[col] for col in columns))
+    if batch_size <= 1:
+        for row in rows:
+            cursor.execute(insert_query, row)
+        return len(rows)
 
-    conn.commit()
-    cursor.close()
-    conn.close()
+    # mysql.connector rewrites executemany() on INSERT ... VALUES
+    # into a single multi-row INSERT per batch
+    for i in range(0, len(rows), batch_size):
+        cursor.executemany(insert_query, rows[i:i + batch_size])
+    return len(rows)
 
-    print(f"✅ Loaded data into {table_name}")
 
+def load_infile(cursor, csv_path, table_name, columns):
+    # Returns the number of loaded rows, or None when LOAD DATA LOCAL
+    # is not possible here and the caller should fall back to INSERTs.
+    with open(csv_path, "r", newline="") as f:
+        header_line = f.readline()
+    header = header_line.rstrip("\r\n").split(",")
+    if header != list(columns):
+        return None
+    line_end = "\\r\\n" if header_line.endswith("\r\n") else "\\n"
 
-# -----------------------------------
-# AGGREGATED TABLES
-# -----------------------------------
+    cursor.execute("SHOW VARIABLES LIKE 'local_infile'")
+    setting = cursor.fetchone()
+    if not setting or str(setting[1]).upper() not in ("ON", "1"):
+        print(f"⚠️ local_infile is disabled on the server, using batched INSERTs for {table_name}")
+        return None
+
+    # The slugs are read into user variables and resolved to their keys
+    # on the server, after making sure every key already exists
+    ensure_file_dimensions(cursor, csv_path, columns)
+    targets = [f"@{col}" if col in ("State", "District") else col for col in columns]
+    assignments = ["State_ID = (SELECT State_ID FROM dim_state WHERE State = @State)"]
+    if "District" in columns:
+        assignments.append("""District_ID = (
+        SELECT d.District_ID FROM dim_district d JOIN dim_state s ON s.State_ID = d.State_ID
+        WHERE s.State = @State AND d.District = @District)""")
+
+    load_query = f"""
+    LOAD DATA LOCAL INFILE %s
+    REPLACE INTO TABLE {table_name}
+    FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+    LINES TERMINATED BY '{line_end}'
+    IGNORE 1 LINES
+    ({", ".join(targets)})
+    SET {", ".join(assignments)}
+    """
+    try:
+        cursor.execute(load_query, (csv_path,))
+    except mysql.connector.Error as e:
+        print(f"⚠️ LOAD DATA LOCAL INFILE failed for {table_name} ({e.msg}), using batched INSERTs")
+        return None
+    # REPLACE counts a replaced row twice in rowcount, so count the file instead
+    with open(csv_path, "r") as f:
+        return sum(1 for _ in f) - 1
+
+
+def ensure_file_dimensions(cursor, path, columns):
+    key_columns = [col for col in ("State", "District") if col in columns]
+    if path.endswith(".parquet"):
+        keys = pd.read_parquet(path, columns=key_columns)
+    else:
+        keys = pd.read_csv(path, usecols=key_columns)
+    keys = keys.astype(str).drop_duplicates()
+    districts = list(keys.itertuples(index=False, name=None)) if "District" in key_columns else ()
+    ensure_dimensions(cursor, keys["State"].unique(), districts)
 
-load_csv_to_mysql(
-    "dataframes/aggregated_transaction.csv",
-    "aggregated_transaction",
-    ["State", "Year", "Quarter", "Transaction_Type",
-     "Transaction_Count", "Transaction_Amount"]
-)
-
-load_csv_to_mysql(
-    "dataframes/aggregated_insurance.csv",
-    "aggregated_insurance",
-    ["State", "Year", "Quarter",
-     "Insurance_Count", "Insurance_Amount"]
-)
-
-load_csv_to_mysql(
-    "dataframes/aggregated_user.csv",
-    "aggregated_user",
-    ["State", "Year", "Quarter",
-     "User_Device", "User_Count", "User_Share"]
-)
 
 # -----------------------------------
-# MAP TABLES
+# Helper functions for incremental loads
 # -----------------------------------
+def dataframe_rows(df, columns):
+    # astype(object) turns numpy scalars into plain Python values,
+    # which is what mysql.connector knows how to bind
+    values = df[columns].astype(object)
+    values = values.where(pd.notna(values), None)
+    return list(values.itertuples(index=False, name=None))
+
+
+def replace_slices(table_name, columns, df, slices):
+    # Deletes every (State, Year, Quarter) slice and upserts its new rows
+    # in one transaction, so a re-ingested quarter replaces the old one
+    # including districts that no longer appear in it.
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("USE phonepe_db")
+
+    delete_query = f"""
+    DELETE FROM {table_name}
+    WHERE State_ID = (SELECT State_ID FROM dim_state WHERE State = %s)
+      AND Year = %s AND Quarter = %s
+    """
+
+    try:
+        if table_name in PARTITIONED_TABLES:
+            ensure_partitions(cursor, table_name, {year for _, year, _ in slices})
+        cursor.executemany(delete_query, sorted(slices))
+        insert_rows(cursor, table_name, columns, dataframe_rows(df, columns), DEFAULT_BATCH_SIZE)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    print(f"✅ Replaced {len(slices)} slices in {table_name}")
 
-load_csv_to_mysql(
-    "dataframes/map_transaction.csv",
-    "map_transaction",
-    ["State", "Year", "Quarter",
-     "District", "Transaction_Count", "Transaction_Amount"]
-)
-
-load_csv_to_mysql(
-    "dataframes/map_insurance.csv",
-    "map_insurance",
-    ["State", "Year", "Quarter",
-     "District", "Insurance_Count", "Insurance_Amount"]
-)
-
-load_csv_to_mysql(
-    "dataframes/map_user.csv",
-    "map_user",
-    ["State", "Year", "Quarter",
-     "District", "User_Count"]
-)
 
 # -----------------------------------
-# TOP TABLES
+# Atomic multi-table load
+# Every table is loaded concurrently into an empty <table>__staging copy
+# over a shared connection pool. Only when all of them succeeded are the
+# staging tables swapped in with a single RENAME TABLE, which MySQL runs
+# atomically, so readers see either the old data or the new data.
 # -----------------------------------
+STAGING_SUFFIX = "__staging"
+OLD_SUFFIX = "__old"
+
+
+def load_all_atomic(tables=None, source="csv", mode="bulk", batch_size=DEFAULT_BATCH_SIZE, workers=None,
+                    source_dir=OUTPUT_DIR):
+    tables = list(tables or TABLES)
+    workers = workers or len(tables)
+    pool = get_pool(pool_size=workers + 1, allow_local_infile=(mode == "bulk"))
+
+    conn = pool.get_connection()
+    cursor = conn.cursor()
+    try:
+        # New states/districts are registered once up front, so the
+        # parallel loads only ever read the dimension tables
+        for table_name in tables:
+            ensure_file_dimensions(cursor, os.path.join(source_dir, f"{table_name}.{source}"),
+                                   table_columns(table_name))
+        conn.commit()
+
+        for table_name in tables:
+            staging = table_name + STAGING_SUFFIX
+            cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+            cursor.execute(f"CREATE TABLE {staging} LIKE {table_name}")
+
+        def load_one(table_name):
+            return load_csv_to_mysql(
+                os.path.join(source_dir, f"{table_name}.{source}"),
+                table_name + STAGING_SUFFIX,
+                table_columns(table_name),
+                mode=mode,
+                batch_size=batch_size,
+                conn=pool.get_connection(),
+            )
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                rows = dict(zip(tables, executor.map(load_one, tables)))
+        except Exception:
+            for table_name in tables:
+                cursor.execute(f"DROP TABLE IF EXISTS {table_name}{STAGING_SUFFIX}")
+            raise
+
+        renames = ", ".join(
+            f"{t} TO {t}{OLD_SUFFIX}, {t}{STAGING_SUFFIX} TO {t}" for t in tables
+        )
+        for table_name in tables:
+            cursor.execute(f"DROP TABLE IF EXISTS {table_name}{OLD_SUFFIX}")
+        cursor.execute(f"RENAME TABLE {renames}")
+        for table_name in tables:
+            cursor.execute(f"DROP TABLE {table_name}{OLD_SUFFIX}")
+    finally:
+        cursor.close()
+        conn.close()
+
+    print(f"🔁 Published {len(tables)} tables atomically")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load dataframes/*.csv into MySQL")
+    parser.add_argument("--mode", choices=LOAD_MODES, default="bulk")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--tables", nargs="+", choices=list(TABLES), default=None)
+    parser.add_argument("--source", choices=["csv", "parquet"], default="csv",
+                        help="Read dataframes/*.csv or the typed dataframes/*.parquet snapshots")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Tables loaded at the same time (default: all of them)")
+    parser.add_argument("--in-place", action="store_true",
+                        help="Upsert into the live tables one by one instead of staging + atomic swap")
+    args = parser.parse_args()
+
+    total_start = time.perf_counter()
+    if not args.in_place:
+        load_all_atomic(args.tables, args.source, args.mode, args.batch_size, args.workers)
+        build_rollups()
+        print(f"🎉 ALL TABLES LOADED SUCCESSFULLY INTO MYSQL in {time.perf_counter() - total_start:.2f}s")
+        return
+
+    for table_name in args.tables or TABLES:
+        load_csv_to_mysql(
+            f"dataframes/{table_name}.{args.source}",
+            table_name,
+            table_columns(table_name),
+            mode=args.mode,
+            batch_size=args.batch_size,
+        )
+
+    build_rollups()
+    print(f"🎉 ALL CSV FILES LOADED SUCCESSFULLY INTO MYSQL in {time.perf_counter() - total_start:.2f}s")
+
 
-load_csv_to_mysql(
-    "dataframes/top_transaction.csv",
-    "top_transaction",
-    ["State", "Year", "Quarter",
-     "District", "Transaction_Count", "Transaction_Amount"]
-)
-
-load_csv_to_mysql(
-    "dataframes/top_insurance.csv",
-    "top_insurance",
-    ["State", "Year", "Quarter",
-     "District", "Insurance_Count", "Insurance_Amount"]
-)
-
-load_csv_to_mysql(
-    "dataframes/top_user.csv",
-    "top_user",
-    ["State", "Year", "Quarter",
-     "District", "Registered_Users"]
-)
-
-print("🎉 ALL CSV FILES LOADED SUCCESSFULLY INTO MYSQL")
+if __name__ == "__main__":
+    main()
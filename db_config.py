@@ -1,14 +1,169 @@
 import mysql.connector
+from mysql.connector import pooling, errors
 import os
+import time
+import threading
+import weakref
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 # Load .env file
 load_dotenv()
 
-def get_connection():
-    return mysql.connector.connect(
+# "mysql" or "memory" (serve the dashboard from dataframes/ snapshots)
+DATA_BACKEND = os.getenv("DATA_BACKEND", "mysql")
+
+# Pool settings (all optional in .env)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))       # seconds to wait for a free connection
+POOL_PING = os.getenv("DB_POOL_PING", "1") == "1"            # ping + reconnect on every borrow
+POOL_PING_ATTEMPTS = int(os.getenv("DB_POOL_PING_ATTEMPTS", 3))
+POOL_PING_DELAY = float(os.getenv("DB_POOL_PING_DELAY", 1))  # seconds between reconnect attempts
+
+
+def connection_config(**kwargs):
+    return dict(
         host=os.getenv("DB_HOST"),
         user=os.getenv("DB_USER"),
         password=os.getenv("DB_PASSWORD"),
-        database="phonepe_db"
+        database="phonepe_db",
+        **kwargs
     )
+
+
+def get_connection(**kwargs):
+    return mysql.connector.connect(**connection_config(**kwargs))
+
+
+def is_connection_error(e):
+    # pandas wraps driver errors, so look at the cause as well
+    lost = (errors.OperationalError, errors.InterfaceError)
+    return isinstance(e, lost) or isinstance(e.__cause__, lost)
+
+
+# -------------------------------
+# CONNECTION POOL
+# Wraps MySQLConnectionPool so that borrowing waits for a free
+# connection instead of failing at once, borrowed connections are
+# health-checked, and work that hits a dropped connection is retried
+# once on a fresh one.
+# -------------------------------
+# Every pool created in this process, for the load test's usage report
+POOLS = weakref.WeakSet()
+
+
+class ConnectionPool:
+    def __init__(self, pool_size=None, timeout=None, ping=None, pool_name="phonepe_pool",
+                 reset_session=True, **kwargs):
+        self.pool_size = pool_size or POOL_SIZE
+        self.timeout = POOL_TIMEOUT if timeout is None else timeout
+        self.ping = POOL_PING if ping is None else ping
+        # reset_session=False keeps session state, including server-side
+        # prepared statements, alive between borrows
+        self._pool = pooling.MySQLConnectionPool(
+            pool_name=pool_name,
+            pool_size=self.pool_size,
+            pool_reset_session=reset_session,
+            **connection_config(**kwargs)
+        )
+        self._stats_lock = threading.Lock()
+        self._stats = dict(borrows=0, waits=0, wait_ms=0.0, timeouts=0, in_use=0, peak_in_use=0)
+        POOLS.add(self)
+
+    def get_connection(self):
+        # Closing the returned connection hands it back to the pool
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        while True:
+            try:
+                conn = self._pool.get_connection()
+                break
+            except errors.PoolError:
+                waited = True
+                if time.monotonic() >= deadline:
+                    self._count(timeouts=1)
+                    raise
+                time.sleep(0.05)
+        self._count(borrows=1, waits=int(waited), wait_ms=(time.monotonic() - start) * 1000)
+
+        if self.ping:
+            try:
+                conn.ping(reconnect=True, attempts=POOL_PING_ATTEMPTS, delay=POOL_PING_DELAY)
+            except Exception:
+                conn.close()
+                raise
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self.get_connection()
+        self._count(in_use=1)
+        try:
+            yield conn
+        finally:
+            self._count(in_use=-1)
+            conn.close()
+
+    # -------------------------------
+    # USAGE STATS
+    # borrows, borrows that had to wait for a free connection, total
+    # wait, timeouts, and connections held through connection() / run()
+    # right now and at peak
+    # -------------------------------
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for key, delta in deltas.items():
+                self._stats[key] += delta
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], self._stats["in_use"])
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats, pool_size=self.pool_size, wait_ms=round(self._stats["wait_ms"], 3))
+
+    def reset_stats(self):
+        with self._stats_lock:
+            in_use = self._stats["in_use"]
+            self._stats = dict(borrows=0, waits=0, wait_ms=0.0, timeouts=0, in_use=in_use, peak_in_use=in_use)
+
+    def run(self, fn):
+        # fn(conn) is called with a borrowed connection
+        try:
+            with self.connection() as conn:
+                return fn(conn)
+        except Exception as e:
+            if not is_connection_error(e):
+                raise
+        # The pool reconnects dead connections when they are borrowed again
+        with self.connection() as conn:
+            return fn(conn)
+
+
+def get_pool(pool_size=None, pool_name="phonepe_pool", reset_session=True, **kwargs):
+    return ConnectionPool(pool_size=pool_size, pool_name=pool_name,
+                          reset_session=reset_session, **kwargs)
+
+
+def run_with_connection(source, fn):
+    # source is either a ConnectionPool or a plain connection
+    if isinstance(source, ConnectionPool):
+        return source.run(fn)
+    return fn(source)
+
+
+def pool_stats():
+    # Usage of every live pool in this process (see ConnectionPool.stats)
+    return [pool.stats() for pool in list(POOLS)]
+
+
+def get_data_source(**pool_kwargs):
+    # What the dashboard queries: a MySQL pool or the in-memory store.
+    # The pool keeps sessions by default, so prepared statements are
+    # reused across borrows (see queries.prepared_cursor)
+    if DATA_BACKEND == "memory":
+        from memory_backend import MemoryStore
+        return MemoryStore()
+    if DATA_BACKEND != "mysql":
+        raise ValueError(f"Unknown DATA_BACKEND {DATA_BACKEND}, expected mysql or memory")
+    pool_kwargs.setdefault("reset_session", False)
+    return get_pool(**pool_kwargs)
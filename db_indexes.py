@@ -0,0 +1,135 @@
+import argparse
+
+from db_config import get_connection
+from queries import QUERIES
+
+# -------------------------------
+# COVERING INDEXES
+# Every dashboard query filters on Year + Quarter and then groups by one
+# dimension, so each index leads with (Year, Quarter), then the grouped
+# column, then the summed metric. MySQL can answer those queries from
+# the index alone without touching the clustered rows.
+# -------------------------------
+INDEXES = {
+    "aggregated_transaction": {
+        "ix_yq_state_amount": ["Year", "Quarter", "State_ID", "Transaction_Count", "Transaction_Amount"],
+        "ix_yq_type_count": ["Year", "Quarter", "Transaction_Type", "Transaction_Count"],
+    },
+    "aggregated_user": {
+        "ix_yq_state_users": ["Year", "Quarter", "State_ID", "User_Count"],
+        "ix_yq_device_users": ["Year", "Quarter", "User_Device", "User_Count"],
+    },
+    "aggregated_insurance": {
+        "ix_yq_state_amount": ["Year", "Quarter", "State_ID", "Insurance_Count", "Insurance_Amount"],
+    },
+    "map_transaction": {
+        "ix_yq_district_amount": ["Year", "Quarter", "District_ID", "Transaction_Amount"],
+    },
+    "map_insurance": {
+        "ix_yq_district_amount": ["Year", "Quarter", "District_ID", "Insurance_Amount"],
+    },
+    "map_user": {
+        "ix_yq_users_district": ["Year", "Quarter", "User_Count", "District_ID"],
+    },
+    "top_transaction": {
+        "ix_yq_district_amount": ["Year", "Quarter", "District_ID", "Transaction_Amount"],
+    },
+    "top_insurance": {
+        "ix_yq_district_amount": ["Year", "Quarter", "District_ID", "Insurance_Amount"],
+    },
+    "top_user": {
+        "ix_yq_district_users": ["Year", "Quarter", "District_ID", "Registered_Users"],
+    },
+}
+
+# -------------------------------
+# DASHBOARD QUERY SHAPES
+# Every registry query that filters on a period; bound with the latest
+# period (and the Transactions category) for the EXPLAIN check.
+# -------------------------------
+DASHBOARD_QUERIES = {
+    name: (sql, params) for name, (sql, params) in QUERIES.items()
+    if "year" in params and "quarter" in params
+}
+CHECK_CATEGORY = "Transactions"
+
+
+def existing_indexes(cursor, table_name):
+    cursor.execute("""
+    SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table_name,))
+    return {row[0] for row in cursor.fetchall()}
+
+
+def ensure_indexes(cursor, tables=None):
+    for table_name in tables or INDEXES:
+        present = existing_indexes(cursor, table_name)
+        for index_name, columns in INDEXES[table_name].items():
+            if index_name in present:
+                continue
+            cursor.execute(f"CREATE INDEX {index_name} ON {table_name} ({', '.join(columns)})")
+            print(f"📇 Created {index_name} on {table_name}")
+
+
+# -------------------------------
+# EXPLAIN CHECK
+# Returns {query name: [(table, access type, key)]} for every query plan
+# step that reads a table without an index.
+# -------------------------------
+def latest_period(cursor):
+    cursor.execute("""
+    SELECT Year, Quarter FROM aggregated_transaction
+    ORDER BY Year DESC, Quarter DESC LIMIT 1
+    """)
+    return cursor.fetchone()
+
+
+def check_queries(cursor, queries=None, params=None):
+    queries = queries or DASHBOARD_QUERIES
+    params = params or latest_period(cursor)
+
+    values = {"year": params[0], "quarter": params[1], "category": CHECK_CATEGORY}
+
+    problems = {}
+    for name, (sql, param_names) in queries.items():
+        cursor.execute("EXPLAIN " + sql, tuple(values[p] for p in param_names))
+        columns = [d[0] for d in cursor.description]
+        for row in cursor.fetchall():
+            plan = dict(zip(columns, row))
+            if plan.get("table") is None:
+                continue
+            if plan.get("key") is None or plan.get("type") == "ALL":
+                problems.setdefault(name, []).append((plan["table"], plan.get("type"), plan.get("key")))
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create dashboard indexes and verify query plans")
+    parser.add_argument("--check-only", action="store_true",
+                        help="Only run the EXPLAIN check, do not create indexes")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        if not args.check_only:
+            ensure_indexes(cursor)
+            conn.commit()
+
+        problems = check_queries(cursor)
+    finally:
+        cursor.close()
+        conn.close()
+
+    for name in DASHBOARD_QUERIES:
+        if name in problems:
+            print(f"❌ {name}: no index used {problems[name]}")
+        else:
+            print(f"✅ {name}: uses an index")
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import datetime
+import argparse
+
+from db_config import get_connection
+
+# -------------------------------
+# PARTITIONED FACT TABLES
+# The district-level map tables are RANGE-partitioned on
+# Year * 10 + Quarter with one partition per quarter (p2024q1, ...),
+# so a single-quarter query prunes to one partition and a quarter can be
+# reloaded with EXCHANGE PARTITION.
+# -------------------------------
+PARTITIONED_TABLES = ["map_transaction", "map_insurance", "map_user"]
+FIRST_YEAR = 2018
+PARTITION_EXPRESSION = "Year * 10 + Quarter"
+
+
+def partition_name(year, quarter):
+    return f"p{year}q{quarter}"
+
+
+def partition_definitions(years):
+    return [
+        f"PARTITION {partition_name(year, quarter)} VALUES LESS THAN ({year * 10 + quarter + 1})"
+        for year in sorted(years)
+        for quarter in range(1, 5)
+    ]
+
+
+def partition_clause(last_year=None):
+    last_year = last_year or datetime.date.today().year
+    definitions = ",\n    ".join(partition_definitions(range(FIRST_YEAR, last_year + 1)))
+    return f"PARTITION BY RANGE ({PARTITION_EXPRESSION}) (\n    {definitions}\n)"
+
+
+def partitioned_years(cursor, table_name):
+    cursor.execute("""
+    SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+    """, (table_name,))
+    return {int(row[0][1:5]) for row in cursor.fetchall()}
+
+
+def partition_table(cursor, table_name, last_year=None):
+    # Converts an existing, unpartitioned table in place
+    if partitioned_years(cursor, table_name):
+        return
+    cursor.execute(f"ALTER TABLE {table_name} {partition_clause(last_year)}")
+    print(f"🧩 Partitioned {table_name} by {PARTITION_EXPRESSION}")
+
+
+def ensure_partitions(cursor, table_name, years):
+    # Adds the four quarter partitions of every year newer than the last
+    # partition. Unpartitioned tables are left alone.
+    existing = partitioned_years(cursor, table_name)
+    if not existing or not years:
+        return
+    new_years = range(max(existing) + 1, max(years) + 1)
+    if not new_years:
+        return
+    definitions = ", ".join(partition_definitions(new_years))
+    cursor.execute(f"ALTER TABLE {table_name} ADD PARTITION ({definitions})")
+    print(f"🧩 Added partitions for {', '.join(map(str, new_years))} to {table_name}")
+
+
+# -------------------------------
+# QUARTER RELOAD BY PARTITION EXCHANGE
+# The quarter is loaded into an unpartitioned copy of the table off to
+# the side, then swapped with the live partition as a metadata-only
+# operation. An empty quarter is refused, since the exchange would
+# silently empty the live partition. The rollups are rebuilt afterwards.
+# -------------------------------
+def exchange_quarter(conn, table_name, year, quarter, columns, rows):
+    from data_loader import insert_rows, DEFAULT_BATCH_SIZE
+
+    if not rows:
+        raise ValueError(f"No {table_name} rows for Q{quarter} {year}, refusing to empty its partition")
+    swap = f"{table_name}__swap"
+    cursor = conn.cursor()
+    try:
+        ensure_partitions(cursor, table_name, {year})
+        cursor.execute(f"DROP TABLE IF EXISTS {swap}")
+        cursor.execute(f"CREATE TABLE {swap} LIKE {table_name}")
+        cursor.execute(f"ALTER TABLE {swap} REMOVE PARTITIONING")
+        insert_rows(cursor, swap, columns, rows, DEFAULT_BATCH_SIZE)
+        conn.commit()
+        cursor.execute(
+            f"ALTER TABLE {table_name} EXCHANGE PARTITION {partition_name(year, quarter)} WITH TABLE {swap}"
+        )
+    finally:
+        # After a failed load or exchange too, so no swap table is left behind
+        try:
+            cursor.execute(f"DROP TABLE IF EXISTS {swap}")
+        finally:
+            cursor.close()
+    print(f"🔁 Reloaded {table_name} Q{quarter} {year} by partition exchange ({len(rows)} rows)")
+
+
+def main():
+    import pandas as pd
+    from data_loader import dataframe_rows
+    from pulse_ingestion import table_columns
+    from rollups import build_rollups
+
+    parser = argparse.ArgumentParser(description="Reload one quarter of the partitioned map tables")
+    parser.add_argument("year", type=int)
+    parser.add_argument("quarter", type=int, choices=[1, 2, 3, 4])
+    parser.add_argument("--tables", nargs="+", choices=PARTITIONED_TABLES, default=PARTITIONED_TABLES)
+    args = parser.parse_args()
+
+    # Every table is read and checked before the first exchange
+    quarter_rows = {}
+    for table_name in args.tables:
+        columns = table_columns(table_name)
+        df = pd.read_csv(f"dataframes/{table_name}.csv", float_precision="round_trip")
+        df = df[(df["Year"] == args.year) & (df["Quarter"] == args.quarter)]
+        if df.empty:
+            print(f"❌ dataframes/{table_name}.csv has no rows for Q{args.quarter} {args.year}, "
+                  "nothing was exchanged")
+            raise SystemExit(1)
+        quarter_rows[table_name] = (columns, dataframe_rows(df, columns))
+
+    conn = get_connection()
+    exchanged = 0
+    try:
+        for table_name, (columns, rows) in quarter_rows.items():
+            exchange_quarter(conn, table_name, args.year, args.quarter, columns, rows)
+            exchanged += 1
+    finally:
+        # Also after a failed exchange, for the tables already swapped in
+        if exchanged:
+            build_rollups(conn)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# -----------------------------------
+# STATE / DISTRICT DIMENSIONS
+# The fact tables store small integer State_ID / District_ID keys; the
+# Pulse slugs and the display names (as used by the India GeoJSON) are
+# stored once in dim_state and dim_district.
+# No FOREIGN KEY constraints are declared because partitioned InnoDB
+# tables (db_partitions.py) cannot have them.
+# -----------------------------------
+STATE_NAMES = {
+    "andaman-&-nicobar-islands": "Andaman and Nicobar Islands",
+    "andhra-pradesh": "Andhra Pradesh",
+    "arunachal-pradesh": "Arunachal Pradesh",
+    "assam": "Assam",
+    "bihar": "Bihar",
+    "chandigarh": "Chandigarh",
+    "chhattisgarh": "Chhattisgarh",
+    "dadra-&-nagar-haveli-&-daman-&-diu": "Dadra and Nagar Haveli and Daman and Diu",
+    "delhi": "Delhi",
+    "goa": "Goa",
+    "gujarat": "Gujarat",
+    "haryana": "Haryana",
+    "himachal-pradesh": "Himachal Pradesh",
+    "jammu-&-kashmir": "Jammu and Kashmir",
+    "jharkhand": "Jharkhand",
+    "karnataka": "Karnataka",
+    "kerala": "Kerala",
+    "ladakh": "Ladakh",
+    "lakshadweep": "Lakshadweep",
+    "madhya-pradesh": "Madhya Pradesh",
+    "maharashtra": "Maharashtra",
+    "manipur": "Manipur",
+    "meghalaya": "Meghalaya",
+    "mizoram": "Mizoram",
+    "nagaland": "Nagaland",
+    "odisha": "Odisha",
+    "puducherry": "Puducherry",
+    "punjab": "Punjab",
+    "rajasthan": "Rajasthan",
+    "sikkim": "Sikkim",
+    "tamil-nadu": "Tamil Nadu",
+    "telangana": "Telangana",
+    "tripura": "Tripura",
+    "uttar-pradesh": "Uttar Pradesh",
+    "uttarakhand": "Uttarakhand",
+    "west-bengal": "West Bengal"
+}
+
+DIMENSION_TABLES = {
+    "dim_state": """
+    CREATE TABLE IF NOT EXISTS dim_state (
+        State_ID SMALLINT AUTO_INCREMENT PRIMARY KEY,
+        State VARCHAR(100) NOT NULL,
+        State_Name VARCHAR(100) NOT NULL,
+        UNIQUE KEY uq_state (State)
+    )
+    """,
+    "dim_district": """
+    CREATE TABLE IF NOT EXISTS dim_district (
+        District_ID INT AUTO_INCREMENT PRIMARY KEY,
+        State_ID SMALLINT NOT NULL,
+        District VARCHAR(100) NOT NULL,
+        UNIQUE KEY uq_state_district (State_ID, District)
+    )
+    """,
+}
+
+# Slug column in the dataframes -> key column in the fact tables
+KEY_COLUMN_IDS = {"State": "State_ID", "District": "District_ID"}
+
+
+def state_display_name(state):
+    return STATE_NAMES.get(state) or state.replace("-", " ").title()
+
+
+def db_columns(columns):
+    return [KEY_COLUMN_IDS.get(col, col) for col in columns]
+
+
+def create_dimension_tables(cursor):
+    for ddl in DIMENSION_TABLES.values():
+        cursor.execute(ddl)
+
+
+# -----------------------------------
+# KEY LOOKUP
+# Unknown states/districts are added on the fly, so a new Pulse release
+# never needs a separate dimension load.
+# -----------------------------------
+def state_ids(cursor):
+    cursor.execute("SELECT State, State_ID FROM dim_state")
+    return dict(cursor.fetchall())
+
+
+def district_ids(cursor):
+    cursor.execute("""
+    SELECT s.State, d.District, d.District_ID
+    FROM dim_district d JOIN dim_state s ON s.State_ID = d.State_ID
+    """)
+    return {(state, district): district_id for state, district, district_id in cursor.fetchall()}
+
+
+def ensure_dimensions(cursor, states, districts=()):
+    # states: iterable of slugs, districts: iterable of (state slug, district)
+    states = set(states) | {state for state, _ in districts}
+
+    known_states = state_ids(cursor)
+    missing = sorted(states - known_states.keys())
+    if missing:
+        cursor.executemany(
+            "INSERT IGNORE INTO dim_state (State, State_Name) VALUES (%s, %s)",
+            [(state, state_display_name(state)) for state in missing],
+        )
+        known_states = state_ids(cursor)
+
+    known_districts = district_ids(cursor)
+    missing = sorted(set(districts) - known_districts.keys())
+    if missing:
+        cursor.executemany(
+            "INSERT IGNORE INTO dim_district (State_ID, District) VALUES (%s, %s)",
+            [(known_states[state], district) for state, district in missing],
+        )
+        known_districts = district_ids(cursor)
+
+    return known_states, known_districts
+
+
+def encode_rows(cursor, columns, rows):
+    # (State, ..., District, ...) slug rows -> (State_ID, ..., District_ID, ...)
+    if "State" not in columns:
+        return columns, rows
+
+    s = columns.index("State")
+    d = columns.index("District") if "District" in columns else None
+    states = {row[s] for row in rows}
+    districts = {(row[s], row[d]) for row in rows} if d is not None else set()
+    known_states, known_districts = ensure_dimensions(cursor, states, districts)
+
+    encoded = []
+    for row in rows:
+        row = list(row)
+        if d is not None:
+            row[d] = known_districts[(row[s], row[d])]
+        row[s] = known_states[row[s]]
+        encoded.append(tuple(row))
+    return db_columns(columns), encoded
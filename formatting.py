@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# UNITS
+# All helpers take a scalar, a numpy array or a pandas Series and work
+# on the whole column at once; Series keep their index.
+# -------------------------------
+CRORE = 1e7
+LAKH = 1e5
+
+
+def scale(values, unit, decimals=2):
+    return np.round(values / unit, decimals)
+
+
+def to_crore(values):
+    return scale(values, CRORE)
+
+
+def to_lakh(values):
+    return scale(values, LAKH)
+
+
+# -------------------------------
+# INDIAN NUMBERING
+# 123456789 -> "12,34,56,789": the last three digits, then groups of
+# two. Every value is laid out as a fixed-width row of digits with the
+# commas in fixed columns, and the leading zeros are stripped in one
+# pass, so no Python code runs per row. Missing values format as "".
+# -------------------------------
+def _layout(ndigits):
+    # digit column -> output column, with a comma before the last three
+    # digits and before every second digit to the left of them
+    commas = list(range(ndigits - 3, 0, -2))
+    columns = [i + sum(1 for c in commas if c <= i) for i in range(ndigits)]
+    return columns, ndigits + len(commas)
+
+
+def _digit_matrix(values, ndigits):
+    # (rows, ndigits) unicode code points, zero padded on the left
+    powers = 10 ** np.arange(ndigits - 1, -1, -1, dtype=np.int64)
+    return ((values[:, None] // powers) % 10 + ord("0")).astype(np.uint32)
+
+
+def _as_text(matrix):
+    return np.ascontiguousarray(matrix).view(f"U{matrix.shape[1]}").ravel()
+
+
+def indian_number(values, decimals=0, prefix="", suffix=""):
+    arr = np.asarray(values, dtype="float64")
+    is_scalar = arr.ndim == 0
+    arr = np.atleast_1d(arr)
+
+    missing = np.isnan(arr)
+    factor = 10 ** decimals
+    scaled = np.round(np.abs(np.where(missing, 0, arr)) * factor).astype(np.int64)
+    whole = scaled // factor
+
+    ndigits = len(str(int(whole.max()))) if len(whole) else 1
+    columns, width = _layout(ndigits)
+    grouped = np.full((len(arr), width), ord(","), dtype=np.uint32)
+    grouped[:, columns] = _digit_matrix(whole, ndigits)
+    out = np.strings.lstrip(_as_text(grouped), "0,")
+    out = np.where(out == "", "0", out)
+
+    if decimals:
+        out = np.strings.add(np.strings.add(out, "."), _as_text(_digit_matrix(scaled % factor, decimals)))
+
+    negative = (arr < 0) & (scaled > 0)
+    out = np.where(negative, np.strings.add("-", out), out)
+    if prefix:
+        out = np.strings.add(prefix, out)
+    if suffix:
+        out = np.strings.add(out, suffix)
+    out = np.where(missing, "", out)
+
+    if is_scalar:
+        return str(out[0])
+    if isinstance(values, pd.Series):
+        return pd.Series(out, index=values.index, name=values.name, dtype=object)
+    return out
+
+
+def format_count(values, suffix=""):
+    return indian_number(values, 0, suffix=suffix)
+
+
+def format_crore(values):
+    return indian_number(values / CRORE, 2, "₹ ", " Cr")
+
+
+def format_lakh(values):
+    return indian_number(values / LAKH, 2, "₹ ", " Lakh")
@@ -0,0 +1,204 @@
+import argparse
+import json
+import math
+import os
+import urllib.request
+from functools import lru_cache
+
+# -------------------------------
+# INDIA STATE BOUNDARIES
+# The dashboard maps used to hand Plotly the gist URL, so every render
+# downloaded the full-resolution file. The boundaries are now kept in
+# assets/geo, pre-simplified to a few precision levels, parsed once per
+# process and passed to Plotly as a dict.
+# -------------------------------
+SOURCE_URL = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/india_states.geojson"
+GEO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "geo")
+SOURCE_FILE = "india_states.geojson"
+FEATURE_ID_KEY = "properties.ST_NM"
+
+# level -> (Douglas-Peucker tolerance in degrees, decimals kept)
+# 0.01 degrees is roughly 1 km, far below what a state-level map shows
+LEVELS = {
+    "full": (0, 6),
+    "medium": (0.01, 3),
+    "low": (0.05, 2),
+}
+DEFAULT_LEVEL = os.getenv("MAP_GEOJSON_LEVEL", "medium")
+
+
+def level_path(level, geo_dir=GEO_DIR):
+    return os.path.join(geo_dir, f"india_states.{level}.geojson")
+
+
+# -------------------------------
+# SIMPLIFICATION
+# -------------------------------
+def point_segment_distance(p, a, b):
+    (px, py), (ax, ay), (bx, by) = p, a, b
+    dx, dy = bx - ax, by - ay
+    if dx == 0 and dy == 0:
+        # Closed rings start and end on the same point
+        return math.hypot(px - ax, py - ay)
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def douglas_peucker(points, tolerance):
+    if tolerance <= 0 or len(points) < 3:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_dist, index = 0.0, None
+        for i in range(first + 1, last):
+            dist = point_segment_distance(points[i], points[first], points[last])
+            if dist > max_dist:
+                max_dist, index = dist, i
+        if index is not None and max_dist > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [p for p, k in zip(points, keep) if k]
+
+
+def round_ring(points, decimals):
+    rounded = []
+    for x, y in (point[:2] for point in points):
+        point = [round(x, decimals), round(y, decimals)]
+        if not rounded or rounded[-1] != point:
+            rounded.append(point)
+    if rounded[0] != rounded[-1]:
+        rounded.append(rounded[0])
+    return rounded
+
+
+def simplify_ring(ring, tolerance, decimals):
+    rounded = round_ring(douglas_peucker(ring, tolerance), decimals)
+    if len(rounded) < 4:
+        # Small islands would collapse; keep their outline, at full
+        # precision if rounding alone already collapses them
+        rounded = round_ring(ring, decimals)
+        if len(rounded) < 4:
+            rounded = round_ring(ring, LEVELS["full"][1])
+    return rounded
+
+
+def simplify_geometry(geometry, tolerance, decimals):
+    if geometry["type"] == "Polygon":
+        coordinates = [simplify_ring(ring, tolerance, decimals) for ring in geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        coordinates = [
+            [simplify_ring(ring, tolerance, decimals) for ring in polygon]
+            for polygon in geometry["coordinates"]
+        ]
+    else:
+        raise ValueError(f"Unsupported geometry type {geometry['type']}")
+    return {"type": geometry["type"], "coordinates": coordinates}
+
+
+def simplify_geojson(geojson, tolerance, decimals):
+    # Only the state name is kept; it is all the maps match on
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "properties": {"ST_NM": feature["properties"]["ST_NM"]},
+                "geometry": simplify_geometry(feature["geometry"], tolerance, decimals),
+            }
+            for feature in geojson["features"]
+        ],
+    }
+
+
+# -------------------------------
+# BUILD
+# -------------------------------
+def fetch_source(geo_dir=GEO_DIR, url=SOURCE_URL):
+    os.makedirs(geo_dir, exist_ok=True)
+    path = os.path.join(geo_dir, SOURCE_FILE)
+    with urllib.request.urlopen(url, timeout=60) as response:
+        data = response.read()
+    json.loads(data)   # refuse to store anything that is not JSON
+    with open(path, "wb") as f:
+        f.write(data)
+    print(f"🌐 Downloaded {url} -> {path}")
+    return path
+
+
+def build_levels(geo_dir=GEO_DIR, levels=None):
+    with open(os.path.join(geo_dir, SOURCE_FILE), encoding="utf-8") as f:
+        source = json.load(f)
+
+    for level in levels or LEVELS:
+        tolerance, decimals = LEVELS[level]
+        simplified = simplify_geojson(source, tolerance, decimals)
+        path = level_path(level, geo_dir)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(simplified, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+        points = sum(
+            len(ring)
+            for feature in simplified["features"]
+            for polygon in ([feature["geometry"]["coordinates"]]
+                            if feature["geometry"]["type"] == "Polygon"
+                            else feature["geometry"]["coordinates"])
+            for ring in polygon
+        )
+        print(f"🗺️ {level}: {points:,} points, {os.path.getsize(path) / 1024:.0f} KB -> {path}")
+
+
+# -------------------------------
+# LOAD (once per process)
+# Local files are parsed once and cached. Without them the maps get the
+# source URL, as before the assets existed: the browser downloads it,
+# the server never does, and that fallback is not cached, so building
+# the assets takes effect on the next map.
+# -------------------------------
+@lru_cache(maxsize=None)
+def load_local_states(level=DEFAULT_LEVEL, geo_dir=GEO_DIR):
+    if level not in LEVELS:
+        raise ValueError(f"Unknown map level {level}, expected one of {list(LEVELS)}")
+
+    path = level_path(level, geo_dir)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    source = os.path.join(geo_dir, SOURCE_FILE)
+    if os.path.exists(source):
+        with open(source, encoding="utf-8") as f:
+            return simplify_geojson(json.load(f), *LEVELS[level])
+
+    raise FileNotFoundError(f"Map boundaries {path} are missing")
+
+
+def load_india_states(level=DEFAULT_LEVEL, geo_dir=GEO_DIR):
+    try:
+        return load_local_states(level, geo_dir)
+    except FileNotFoundError:
+        return SOURCE_URL
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the bundled India state boundaries")
+    parser.add_argument("--fetch", action="store_true",
+                        help=f"Download {SOURCE_FILE} before building")
+    parser.add_argument("--dir", default=GEO_DIR, help="Asset directory")
+    parser.add_argument("--levels", nargs="+", choices=list(LEVELS),
+                        help="Levels to build (default: all)")
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch_source(args.dir)
+    build_levels(args.dir, args.levels)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import os
+import json
+import hashlib
+
+MANIFEST_PATH = "dataframes/ingest_manifest.json"
+
+
+# -----------------------------------
+# MANIFEST
+# relative path -> {table, state, year, quarter, size, mtime, sha256}
+# -----------------------------------
+def load_manifest(path=MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    # Write to a temp file first so a crash never leaves a truncated manifest
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_entry(task, stat, sha256):
+    table_name, path, state, year, quarter = task
+    return {
+        "table": table_name,
+        "state": state,
+        "year": year,
+        "quarter": quarter,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "sha256": sha256,
+    }
+
+
+# -----------------------------------
+# DELTA
+# A file only gets hashed when its size or mtime moved, so an
+# unchanged tree costs one stat() per file.
+# Returns (changed tasks, removed entries, new manifest).
+# -----------------------------------
+def diff_manifest(tasks, manifest, data_dir):
+    changed = []
+    new_manifest = {}
+
+    for task in tasks:
+        path = task[1]
+        key = os.path.relpath(path, data_dir).replace(os.sep, "/")
+        stat = os.stat(path)
+        old = manifest.get(key)
+
+        if old and old["size"] == stat.st_size and old["mtime"] == stat.st_mtime:
+            new_manifest[key] = old
+            continue
+
+        sha256 = file_hash(path)
+        new_manifest[key] = make_entry(task, stat, sha256)
+        if not old or old["sha256"] != sha256:
+            changed.append(task)
+
+    removed = [entry for key, entry in manifest.items() if key not in new_manifest]
+    return changed, removed, new_manifest
@@ -0,0 +1,365 @@
+import os
+import json
+import time
+import random
+import argparse
+import threading
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import db_config
+from db_config import get_pool, pool_stats
+from queries import DashboardQueries
+from query_cache import QueryCache, QUERY_CACHE
+from map_figures import state_map_figure
+from pulse_ingestion import OUTPUT_DIR
+from perf import PERF
+
+# -----------------------------------
+# DASHBOARD LOAD TEST
+# N simulated sessions navigate the dashboard at the same time, the way
+# analysts do: mostly paging back through quarters on one page, now
+# and then switching page or category. Two targets:
+#   api -> every step runs the queries (and Home map figures) the page
+#          would run, through DashboardQueries
+#   app -> every session is a headless Streamlit AppTest of app.py, so
+#          the real page functions render each step
+# Both run against MySQL (.env) or the in-memory backend and report
+# throughput, p50/p95/p99 per page and query, and pool usage.
+# -----------------------------------
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+PAGE_WEIGHTS = {
+    "Home": 0.45,
+    "Business Case Analysis": 0.20,
+    "Reports": 0.15,
+    "Database": 0.10,
+    "About": 0.05,
+    "Creator": 0.05,
+}
+
+# What each page queries for its sub-selection (mirrors app.py)
+HOME_CATEGORIES = ["Transactions", "Users", "Insurance"]
+BUSINESS_CASES = {
+    "1️⃣ Transaction Dynamics": "business.transaction_types",
+    "2️⃣ Device Dominance": "home.devices",
+    "3️⃣ Insurance Growth": "business.insurance_states",
+    "4️⃣ Market Expansion": "business.transaction_districts",
+    "5️⃣ User Engagement": "business.user_districts",
+}
+DATABASE_TABLES = {
+    "Aggregated Transaction": "aggregated_transaction",
+    "Aggregated User": "aggregated_user",
+    "Aggregated Insurance": "aggregated_insurance",
+    "Map Transaction": "map_transaction",
+    "Map User": "map_user",
+    "Map Insurance": "map_insurance",
+    "Top Transaction": "top_transaction",
+    "Top User": "top_user",
+    "Top Insurance": "top_insurance",
+}
+PAGE_OPTIONS = {
+    "Home": HOME_CATEGORIES,
+    "Business Case Analysis": list(BUSINESS_CASES),
+    "Reports": HOME_CATEGORIES,
+    "Database": list(DATABASE_TABLES),
+}
+# (widget kind, label) of the page's own selector in app.py
+OPTION_WIDGETS = {
+    "Home": ("selectbox", "Select Category"),
+    "Business Case Analysis": ("radio", "Case study"),
+    "Reports": ("selectbox", "Select Report Category"),
+    "Database": ("radio", "Table"),
+}
+
+
+# -----------------------------------
+# NAVIGATION
+# A step is (page, option, year, quarter). Sessions start on the Home
+# page at the latest quarter.
+# -----------------------------------
+def navigation(rng, periods, steps, period_change=0.6, jump=0.2):
+    index = len(periods) - 1
+    page, option = "Home", HOME_CATEGORIES[0]
+    sequence = []
+    for step in range(steps):
+        if step and rng.random() < period_change:
+            if rng.random() < jump:
+                index = rng.randrange(len(periods))
+            else:
+                index = max(index - 1, 0) if index else len(periods) - 1
+        elif step:
+            page = rng.choices(list(PAGE_WEIGHTS), weights=list(PAGE_WEIGHTS.values()))[0]
+            option = rng.choice(PAGE_OPTIONS[page]) if page in PAGE_OPTIONS else None
+        sequence.append((page, option, *periods[index]))
+    return sequence
+
+
+# -----------------------------------
+# TARGETS
+# -----------------------------------
+def api_step(api, page, option, year, quarter):
+    if page == "Home":
+        state_map_figure(api, option, year, quarter)
+        if option == "Transactions":
+            api.home.totals(option, year, quarter)
+            api.home.top_states(option, year, quarter)
+            api.home.top_districts(option, year, quarter)
+        elif option == "Users":
+            api.home.devices(year, quarter)
+        else:
+            api.home.top_states(option, year, quarter)
+    elif page == "Business Case Analysis":
+        api.run(BUSINESS_CASES[option], year, quarter)
+    elif page == "Reports":
+        api.home.totals(option, year, quarter)
+        if option == "Users":
+            api.home.devices(year, quarter)
+        else:
+            api.home.top_states(option, year, quarter)
+    elif page == "Database":
+        api.run(f"database.sample_{DATABASE_TABLES[option]}")
+
+
+class ApiSession:
+    def __init__(self, api):
+        self.api = api
+
+    def step(self, page, option, year, quarter):
+        api_step(self.api, page, option, year, quarter)
+
+
+def widget(at, kind, label):
+    for w in getattr(at, kind):
+        if w.label == label:
+            return w
+    raise LookupError(f"no {kind} labelled {label!r} on the page")
+
+
+@contextmanager
+def shared_apptest_runtime():
+    # AppTest installs a mock Runtime for the length of one run and sets
+    # it back to None afterwards. With many sessions running at once, one
+    # session finishing would pull the runtime out from under the others,
+    # so while this is active Runtime.instance() falls back to the last
+    # one installed. Everything is put back on exit.
+    from streamlit import config
+    from streamlit.runtime import Runtime
+
+    if getattr(Runtime, "_load_test_shared", False):
+        yield
+        return
+    # This relies on Streamlit internals; refuse to run if they changed
+    original = Runtime.__dict__.get("instance")
+    if not isinstance(original, classmethod) or not hasattr(Runtime, "_instance"):
+        import streamlit
+        raise RuntimeError(
+            f"--target app does not support Streamlit {streamlit.__version__}: it expects "
+            "Runtime.instance to be a classmethod reading Runtime._instance"
+        )
+    last = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last["runtime"] = cls._instance
+            return cls._instance
+        return last["runtime"] if "runtime" in last else original.__func__(cls)
+
+    # Magic re-parses app.py with ast on every run, which is not thread
+    # safe in every Python; app.py does not rely on magic output
+    magic = config.get_option("runner.magicEnabled")
+
+    Runtime.instance = classmethod(instance)
+    Runtime._load_test_shared = True
+    config.set_option("runner.magicEnabled", False)
+    try:
+        yield
+    finally:
+        Runtime.instance = original
+        del Runtime._load_test_shared
+        config.set_option("runner.magicEnabled", magic)
+
+
+class AppSession:
+    def __init__(self, timeout=120):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.at.run()
+
+    def step(self, page, option, year, quarter):
+        at = self.at
+        widget(at.sidebar, "selectbox", "Year").set_value(year)
+        widget(at.sidebar, "selectbox", "Quarter").set_value(quarter)
+        widget(at.sidebar, "radio", "Navigate").set_value(page)
+        at.run()
+        if option is not None:
+            kind, label = OPTION_WIDGETS[page]
+            selector = widget(at, kind, label)
+            if selector.value != option:
+                selector.set_value(option)
+                at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+
+
+# -----------------------------------
+# RUNNER
+# -----------------------------------
+def percentiles(values):
+    if not values:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3), "p99_ms": round(float(p99), 3)}
+
+
+def make_source(backend, pool_size, snapshot_dir):
+    if backend == "memory":
+        from memory_backend import MemoryStore
+        return MemoryStore(snapshot_dir)
+    return get_pool(pool_size=pool_size, pool_name="load_test_pool", reset_session=False)
+
+
+def run_load_test(target="api", users=50, steps=20, backend=None, pool_size=None, cache=True,
+                  think_ms=0, seed=42, snapshot_dir=OUTPUT_DIR):
+    backend = backend or db_config.DATA_BACKEND
+    pool_size = pool_size or db_config.POOL_SIZE
+
+    if target == "app":
+        # app.py builds its own source through get_data_source()
+        db_config.DATA_BACKEND = backend
+        db_config.POOL_SIZE = pool_size
+        periods_api = DashboardQueries(db_config.get_data_source(), QueryCache(maxsize=0))
+    else:
+        source = make_source(backend, pool_size, snapshot_dir)
+        api = DashboardQueries(source, QUERY_CACHE if cache else QueryCache(maxsize=0))
+        periods_api = api
+
+    years = periods_api.filters.years().Year.tolist()
+    quarters = periods_api.filters.quarters().Quarter.tolist()
+    periods = [(int(y), int(q)) for y in years for q in quarters]
+
+    rng = random.Random(seed)
+    plans = [navigation(random.Random(rng.random()), periods, steps) for _ in range(users)]
+
+    latencies = {}
+    errors = []
+    lock = threading.Lock()
+    start_gate = threading.Barrier(users)
+
+    def session(plan):
+        try:
+            runner = AppSession() if target == "app" else ApiSession(api)
+        except Exception:
+            # Do not leave the other sessions waiting at the gate
+            start_gate.abort()
+            raise
+        start_gate.wait()
+        for page, option, year, quarter in plan:
+            started = time.perf_counter()
+            try:
+                runner.step(page, option, year, quarter)
+            except Exception as e:
+                with lock:
+                    errors.append(f"{page} / {option} / Q{quarter} {year}: {e}")
+            ms = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.setdefault(page, []).append(ms)
+            if think_ms:
+                time.sleep(think_ms / 1000)
+
+    for pool in list(db_config.POOLS):
+        pool.reset_stats()
+    PERF.clear()
+
+    started = time.perf_counter()
+    with shared_apptest_runtime() if target == "app" else nullcontext():
+        with ThreadPoolExecutor(max_workers=users) as executor:
+            list(executor.map(session, plans))
+    elapsed = time.perf_counter() - started
+
+    events = [e for e in PERF.snapshot() if e["stage"] == "query"]
+    by_query = {}
+    for event in events:
+        by_query.setdefault(event["name"], []).append(event)
+    all_steps = [ms for values in latencies.values() for ms in values]
+
+    return {
+        "target": target,
+        "backend": backend,
+        "users": users,
+        "steps": len(all_steps),
+        "seconds": round(elapsed, 3),
+        "steps_per_sec": round(len(all_steps) / elapsed, 1),
+        "queries_per_sec": round(len(events) / elapsed, 1),
+        "errors": errors,
+        "overall": percentiles(all_steps),
+        "pages": {page: dict(steps=len(values), **percentiles(values)) for page, values in latencies.items()},
+        "queries": {
+            name: dict(calls=len(group), executed=sum(1 for e in group if not e["cached"]),
+                       **percentiles([e["ms"] for e in group]))
+            for name, group in by_query.items()
+        },
+        "pools": pool_stats(),
+    }
+
+
+def print_report(result):
+    print(f"\n🚦 {result['users']} sessions, target={result['target']}, backend={result['backend']}")
+    print(f"   {result['steps']:,} steps in {result['seconds']:.2f}s -> "
+          f"{result['steps_per_sec']:,} steps/s, {result['queries_per_sec']:,} queries/s")
+    o = result["overall"]
+    print(f"   step latency p50 {o['p50_ms']:.1f} ms, p95 {o['p95_ms']:.1f} ms, p99 {o['p99_ms']:.1f} ms")
+
+    print("\n📄 Pages")
+    for page, p in sorted(result["pages"].items(), key=lambda item: -item[1]["p95_ms"]):
+        print(f"   {page:<26} {p['steps']:>6} steps   p95 {p['p95_ms']:>9.1f} ms   p99 {p['p99_ms']:>9.1f} ms")
+
+    print("\n🧾 Queries")
+    for name, q in sorted(result["queries"].items(), key=lambda item: -item[1]["p95_ms"]):
+        print(f"   {name:<40} {q['calls']:>6} calls ({q['executed']} executed)   "
+              f"p95 {q['p95_ms']:>8.2f} ms   p99 {q['p99_ms']:>8.2f} ms")
+
+    print("\n🔌 Connections")
+    if not result["pools"]:
+        print("   in-memory backend, no connection pool")
+    for s in result["pools"]:
+        print(f"   pool of {s['pool_size']}: {s['borrows']:,} borrows, peak {s['peak_in_use']} in use, "
+              f"{s['waits']:,} waited ({s['wait_ms']:.0f} ms total), {s['timeouts']} timeouts")
+
+    if result["errors"]:
+        print(f"\n❌ {len(result['errors'])} failed steps, e.g. {result['errors'][0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent dashboard sessions")
+    parser.add_argument("--target", choices=["api", "app"], default="api",
+                        help="api: page query mix through DashboardQueries; app: AppTest sessions of app.py")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--steps", type=int, default=20, help="Navigation steps per session")
+    parser.add_argument("--backend", choices=["mysql", "memory"], default=None,
+                        help="Default: DATA_BACKEND from .env")
+    parser.add_argument("--pool-size", type=int, default=None, help="Default: DB_POOL_SIZE")
+    parser.add_argument("--snapshot-dir", default=OUTPUT_DIR,
+                        help="api target: snapshots for the memory backend (app.py reads dataframes/)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="api target: execute every query instead of using the query cache")
+    parser.add_argument("--think-ms", type=int, default=0, help="Pause between steps of a session")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", default=None, help="Also write the full result to this file")
+    args = parser.parse_args()
+
+    result = run_load_test(args.target, args.users, args.steps, args.backend, args.pool_size,
+                           not args.no_cache, args.think_ms, args.seed, args.snapshot_dir)
+    print_report(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
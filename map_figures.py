@@ -0,0 +1,147 @@
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.express as px
+import plotly.io as pio
+from dotenv import load_dotenv
+
+from formatting import format_count, format_crore, format_lakh, CRORE, LAKH
+from perf import timed
+from geo_assets import load_india_states, DEFAULT_LEVEL, FEATURE_ID_KEY
+
+load_dotenv()
+
+FIGURE_CACHE_DIR = os.getenv("FIGURE_CACHE_DIR", os.path.join("cache", "figures"))
+MAP_CATEGORIES = ["Transactions", "Users", "Insurance"]
+# Bump when build_state_map output changes, so cached files are rebuilt
+FIGURE_FORMAT = 2
+
+
+# -------------------------------
+# HOME PAGE CHOROPLETHS
+# -------------------------------
+def build_state_map(df_map, category, year, quarter, geojson):
+    if category == "Transactions":
+        df_map["value"] = df_map["Total_Amount"]
+        df_map["Value_Display"] = format_crore(df_map["value"])
+        df_map["value_plot"] = df_map["value"] / CRORE
+        color, scale = "value_plot", "Plasma"
+        title = f"State-wise Transaction Value – Q{quarter} {year}"
+
+    elif category == "Users":
+        df_map["value"] = df_map["Total_Count"]
+        df_map["Value_Display"] = format_count(df_map["value"], " Users")
+        color, scale = "value", "Purples"
+        title = f"State-wise Registered Users – Q{quarter} {year}"
+
+    else:
+        df_map["value"] = df_map["Total_Amount"]
+        df_map["value_plot"] = df_map["value"] / LAKH   # for color scale
+        df_map["Value_Display"] = format_lakh(df_map["value"])
+        color, scale = "value_plot", "Oranges"
+        title = f"State-wise Insurance Transaction Value – Q{quarter} {year}"
+
+    fig = px.choropleth(
+        df_map,
+        geojson=geojson,
+        featureidkey=FEATURE_ID_KEY,
+        locations="State",
+        color=color,
+        hover_name="State",
+        hover_data={"Value_Display": True, color: False},
+        color_continuous_scale=scale,
+        title=title
+    )
+    fig.update_geos(fitbounds="locations", visible=False)
+    fig.update_layout(height=650)
+    return fig
+
+
+# -------------------------------
+# FIGURE CACHE
+# Built figures keyed by (category, year, quarter, map level or "url",
+# data_version): a bounded in-memory LRU in front of JSON files on
+# disk, so a restarted server does not rebuild quarters it has already
+# drawn. Files of older data versions (or figure formats) are removed
+# once a newer version is seen.
+# -------------------------------
+class FigureCache:
+    def __init__(self, cache_dir=FIGURE_CACHE_DIR, maxsize=64):
+        self.cache_dir = cache_dir
+        self.maxsize = maxsize
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+
+    def path(self, key):
+        category, year, quarter, level, version = key
+        return os.path.join(self.cache_dir, f"{category}_{year}_Q{quarter}_{level}_f{FIGURE_FORMAT}_v{version}.json")
+
+    def prune(self, version):
+        # Called once per data version change
+        if not os.path.isdir(self.cache_dir):
+            return
+        suffix = f"_f{FIGURE_FORMAT}_v{version}.json"
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json") and not name.endswith(suffix):
+                os.remove(os.path.join(self.cache_dir, name))
+
+    def get_or_build(self, key, build):
+        version = key[-1]
+        with self._lock:
+            if version != self._version:
+                self._figures.clear()
+                self._version = version
+                self.prune(version)
+            fig = self._figures.get(key)
+            if fig is not None:
+                self._figures.move_to_end(key)
+                return fig
+
+        path = self.path(key)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                fig = pio.from_json(f.read())
+        else:
+            fig = build()
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(fig.to_json())
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            self._figures[key] = fig
+            while len(self._figures) > self.maxsize:
+                self._figures.popitem(last=False)
+        return fig
+
+
+FIGURE_CACHE = FigureCache()
+
+
+def state_map_figure(api, category, year, quarter, level=DEFAULT_LEVEL):
+    # api is a queries.DashboardQueries; the returned figure is shared,
+    # callers must not modify it
+    year, quarter = int(year), int(quarter)
+    geojson = load_india_states(level)
+    # Maps drawn from the URL fallback are not reused once assets/geo exists
+    source = level if isinstance(geojson, dict) else "url"
+    key = (category, year, quarter, source, api.data_version())
+    def build():
+        df_map = api.home.state_map(category, year, quarter)
+        with timed("figure", f"state_map.{category}"):
+            return build_state_map(df_map, category, year, quarter, geojson)
+
+    return FIGURE_CACHE.get_or_build(key, build)
+
+
+def prewarm_latest(api, level=DEFAULT_LEVEL):
+    latest = api.filters.latest_period()
+    if latest.empty:
+        return
+    year, quarter = latest.Year[0], latest.Quarter[0]
+    for category in MAP_CATEGORIES:
+        state_map_figure(api, category, year, quarter, level)
+    print(f"🗺️ Pre-built maps for Q{quarter} {year}")
@@ -0,0 +1,241 @@
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+from dimensions import KEY_COLUMN_IDS, state_display_name
+from pulse_ingestion import OUTPUT_DIR, TABLES
+from rollups import CATEGORIES, TOP_N
+from snapshots import load_table, snapshot_path, csv_path
+
+# -------------------------------
+# IN-MEMORY BACKEND
+# Serves the named dashboard queries (queries.py) from the snapshots in
+# dataframes/ instead of MySQL. Every query result is computed for
+# every period when the snapshots are loaded, so a query is a dict
+# lookup. The snapshots are reloaded, and the data version bumped,
+# when their files change on disk.
+# -------------------------------
+PERIOD = ["Year", "Quarter"]
+
+
+def by_period(df, prefix=()):
+    # {(*prefix, year, quarter): frame without the period columns}
+    return {
+        (*prefix, int(year), int(quarter)): group.drop(columns=PERIOD).reset_index(drop=True)
+        for (year, quarter), group in df.groupby(PERIOD, sort=False)
+    }
+
+
+def with_state_names(df):
+    df = df.copy()
+    df["State"] = df["State"].astype(str).map(state_display_name)
+    return df
+
+
+def ranked(df, keys, rank_by, rank_column):
+    # ROW_NUMBER() OVER (PARTITION BY Year, Quarter ORDER BY rank_by DESC)
+    df = df.sort_values(PERIOD + [rank_by], ascending=[True, True, False], kind="stable")
+    df[rank_column] = df.groupby(PERIOD).cumcount() + 1
+    return df[PERIOD + keys + ["Total_Count", "Total_Amount", rank_column]]
+
+
+def sums(df, keys, count_col, amount_col):
+    grouped = df.groupby(PERIOD + keys, observed=True, sort=False)
+    out = grouped[count_col].sum().rename("Total_Count").to_frame()
+    out["Total_Amount"] = grouped[amount_col].sum() if amount_col else float("nan")
+    return out.reset_index()
+
+
+# -------------------------------
+# QUERY RESULTS (same columns as the SQL in queries.py)
+# name -> (columns, {params: DataFrame})
+# -------------------------------
+def rollup_results(tables):
+    periods = tables["aggregated_transaction"][PERIOD].drop_duplicates()
+    totals, all_totals, state_map, top_states, top_districts = {}, {}, {}, {}, {}
+
+    for category, (state_table, count_col, amount_col,
+                   district_table, d_count_col, d_amount_col) in CATEGORIES.items():
+        rank_by = "Total_Amount" if amount_col else "Total_Count"
+
+        # Every period gets a totals row, as in rollup_totals
+        period_sums = sums(tables[state_table], [], count_col, amount_col)
+        period_sums = periods.merge(period_sums, on=PERIOD, how="left")
+        period_sums["Total_Count"] = period_sums["Total_Count"].fillna(0).astype("int64")
+        if amount_col:
+            period_sums["Total_Amount"] = period_sums["Total_Amount"].fillna(0.0)
+        period_sums = period_sums[PERIOD + ["Total_Count", "Total_Amount"]]
+        totals.update(by_period(period_sums, (category,)))
+        all_totals[(category,)] = period_sums.sort_values(PERIOD).reset_index(drop=True)
+
+        states = ranked(sums(tables[state_table], ["State"], count_col, amount_col),
+                        ["State"], rank_by, "State_Rank")
+        states = with_state_names(states)
+        state_map.update(by_period(states[PERIOD + ["State", "Total_Count", "Total_Amount"]], (category,)))
+        top = states[states["State_Rank"] <= TOP_N]
+        top_states.update(by_period(top[PERIOD + ["State", "Total_Count", "Total_Amount"]], (category,)))
+
+        districts = ranked(sums(tables[district_table], ["State", "District"], d_count_col, d_amount_col),
+                           ["District"], "Total_Amount" if d_amount_col else "Total_Count", "District_Rank")
+        districts = districts[districts["District_Rank"] <= TOP_N].copy()
+        districts["District"] = districts["District"].astype(str)
+        top_districts.update(by_period(districts[PERIOD + ["District", "Total_Count", "Total_Amount"]], (category,)))
+
+    return {
+        "home.totals": (["Total_Count", "Total_Amount"], totals),
+        "reports.totals": (PERIOD + ["Total_Count", "Total_Amount"], all_totals),
+        "home.state_map": (["State", "Total_Count", "Total_Amount"], state_map),
+        "home.top_states": (["State", "Total_Count", "Total_Amount"], top_states),
+        "home.top_districts": (["District", "Total_Count", "Total_Amount"], top_districts),
+    }
+
+
+def fact_results(tables):
+    def summed(table, key, value, name, descending=True, limit=None, states=False, per_state=False):
+        # per_state: district names repeat across states, and MySQL groups
+        # by District_ID, i.e. by (state, district)
+        keys = ["State", key] if per_state else [key]
+        df = (tables[table].groupby(PERIOD + keys, observed=True)[value].sum()
+              .rename(name).reset_index())[PERIOD + [key, name]]
+        df[key] = df[key].astype(str)
+        if states:
+            df = with_state_names(df)
+        if descending:
+            df = df.sort_values(PERIOD + [name], ascending=[True, True, False], kind="stable")
+        if limit:
+            df = df.groupby(PERIOD).head(limit)
+        return by_period(df)
+
+    user_districts = tables["map_user"][PERIOD + ["District", "User_Count"]].copy()
+    user_districts["District"] = user_districts["District"].astype(str)
+    user_districts = user_districts.sort_values(
+        PERIOD + ["User_Count"], ascending=[True, True, False], kind="stable"
+    ).groupby(PERIOD).head(10)
+
+    return {
+        "home.devices": (["User_Device", "users"],
+                         summed("aggregated_user", "User_Device", "User_Count", "users")),
+        "business.transaction_types": (["Transaction_Type", "count"],
+                                       summed("aggregated_transaction", "Transaction_Type",
+                                              "Transaction_Count", "count", descending=False)),
+        "business.insurance_states": (["State", "amt"],
+                                      summed("aggregated_insurance", "State", "Insurance_Amount",
+                                             "amt", states=True)),
+        "business.transaction_districts": (["District", "amt"],
+                                           summed("map_transaction", "District", "Transaction_Amount",
+                                                  "amt", limit=10, per_state=True)),
+        "business.user_districts": (["District", "User_Count"], by_period(user_districts)),
+    }
+
+
+def filter_results(tables):
+    periods = tables["aggregated_transaction"][PERIOD].drop_duplicates().astype("int64")
+    latest = periods.sort_values(PERIOD, ascending=False).head(1).reset_index(drop=True)
+    return {
+        "filters.years": (["Year"], {(): periods[["Year"]].drop_duplicates().sort_values("Year")
+                                          .reset_index(drop=True)}),
+        "filters.quarters": (["Quarter"], {(): periods[["Quarter"]].drop_duplicates().sort_values("Quarter")
+                                                .reset_index(drop=True)}),
+        "filters.latest_period": (PERIOD, {(): latest}),
+    }
+
+
+def dimension_ids(tables):
+    # State_ID / District_ID as ensure_dimensions assigns them when the
+    # tables are loaded into an empty database: table by table, new
+    # states then new (state, district) pairs, each in sorted order
+    states, districts = {}, {}
+    for table_name in TABLES:
+        df = tables[table_name]
+        pairs = (df[["State", "District"]].astype(str).drop_duplicates()
+                 if "District" in df else pd.DataFrame(columns=["State", "District"]))
+        new_states = set(df["State"].astype(str)) | set(pairs["State"])
+        for state in sorted(new_states - states.keys()):
+            states[state] = len(states) + 1
+        for pair in sorted(set(pairs.itertuples(index=False, name=None)) - districts.keys()):
+            districts[pair] = len(districts) + 1
+    return states, districts
+
+
+def with_ids(df, states, districts):
+    # Slug columns -> the State_ID / District_ID columns of the MySQL tables
+    df = df.copy()
+    if "District" in df:
+        df["District"] = [districts[pair] for pair in
+                          zip(df["State"].astype(str), df["District"].astype(str))]
+    df["State"] = df["State"].astype(str).map(states)
+    return df.rename(columns=KEY_COLUMN_IDS)
+
+
+def sample_results(tables):
+    # SELECT * FROM <table> LIMIT 5: the first rows in primary key order
+    states, districts = dimension_ids(tables)
+    results = {}
+    for table_name, df in tables.items():
+        df = with_ids(df, states, districts)
+        keys = ["State_ID", "Year", "Quarter"] + [
+            col for col in ("Transaction_Type", "User_Device", "District_ID") if col in df
+        ]
+        sample = df.sort_values(keys, kind="stable").head(5).reset_index(drop=True)
+        results[f"database.sample_{table_name}"] = (list(df.columns), {(): sample})
+    return results
+
+
+def build_results(tables):
+    results = {}
+    for build in (rollup_results, fact_results, filter_results, sample_results):
+        results.update(build(tables))
+    return results
+
+
+# -------------------------------
+# STORE
+# The data version is a hash of the snapshot files' names, mtimes and
+# sizes, so it stays the same across restarts for the same files and
+# changes whenever they do (the figure cache on disk is keyed on it).
+# -------------------------------
+def signature_version(signature):
+    text = repr([(os.path.basename(path), mtime, size) for path, mtime, size in signature])
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+class MemoryStore:
+    def __init__(self, snapshot_dir=OUTPUT_DIR):
+        self.snapshot_dir = snapshot_dir
+        self._lock = threading.Lock()
+        self._signature = None
+        self._results = {}
+        self._version = None
+        self.reload()
+
+    def signature(self):
+        # (path, mtime, size) of every snapshot file load_table could read
+        files = []
+        for table_name in TABLES:
+            for path in (snapshot_path(table_name, self.snapshot_dir), csv_path(table_name, self.snapshot_dir)):
+                if os.path.exists(path):
+                    stat = os.stat(path)
+                    files.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(files)
+
+    def reload(self, signature=None):
+        signature = signature or self.signature()
+        tables = {table_name: load_table(table_name, self.snapshot_dir) for table_name in TABLES}
+        results = build_results(tables)
+        with self._lock:
+            self._results = results
+            self._signature = signature
+            self._version = signature_version(signature)
+
+    def data_version(self):
+        signature = self.signature()
+        if signature != self._signature:
+            self.reload(signature)
+        return self._version
+
+    def query(self, name, params):
+        columns, frames = self._results[name]
+        df = frames.get(tuple(params))
+        return df if df is not None else pd.DataFrame(columns=columns)
@@ -0,0 +1,120 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -------------------------------
+# PERFORMANCE EVENTS
+# One event per query or render stage:
+#   {"ts", "page", "stage", "name", "ms", ...stage fields}
+# query events add sql, rows, cached, db_ms and df_ms. Events are kept
+# in a bounded in-process buffer for the Performance page and, when
+# PERF_LOG is set, appended to that file as JSON lines.
+# -------------------------------
+PERF_LOG = os.getenv("PERF_LOG")
+PERF_MAX_EVENTS = int(os.getenv("PERF_MAX_EVENTS", 20000))
+
+_page = contextvars.ContextVar("perf_page", default=None)
+
+
+class PerfRecorder:
+    def __init__(self, maxlen=PERF_MAX_EVENTS, log_path=PERF_LOG):
+        self.events = deque(maxlen=maxlen)
+        self.log_path = log_path
+        self._lock = threading.Lock()
+
+    def record(self, stage, name, ms, **fields):
+        event = {
+            "ts": round(time.time(), 3),
+            "page": _page.get(),
+            "stage": stage,
+            "name": name,
+            "ms": round(ms, 3),
+            **fields,
+        }
+        with self._lock:
+            self.events.append(event)
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(event) + "\n")
+        return event
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.events)
+
+    def to_jsonl(self):
+        return "".join(json.dumps(event) + "\n" for event in self.snapshot())
+
+    def summary(self):
+        # p50 / p95 per (stage, name); query rows split cache hits from
+        # executed queries
+        events = pd.DataFrame(self.snapshot())
+        if events.empty:
+            return events
+        if "cached" not in events:
+            events["cached"] = None
+        if "rows" not in events:
+            events["rows"] = np.nan
+
+        rows = []
+        for (stage, name), group in events.groupby(["stage", "name"], sort=True):
+            executed = group[group["cached"].eq(False)]
+            rows.append({
+                "stage": stage,
+                "name": name,
+                "calls": len(group),
+                "cache_hits": int(group["cached"].eq(True).sum()),
+                "p50_ms": round(float(np.percentile(group["ms"], 50)), 3),
+                "p95_ms": round(float(np.percentile(group["ms"], 95)), 3),
+                "p95_db_ms": round(float(np.percentile(executed["db_ms"], 95)), 3) if len(executed) else None,
+                "p95_df_ms": round(float(np.percentile(executed["df_ms"], 95)), 3) if len(executed) else None,
+                "avg_rows": round(float(group["rows"].mean()), 1) if group["rows"].notna().any() else None,
+            })
+        return pd.DataFrame(rows).sort_values("p95_ms", ascending=False).reset_index(drop=True)
+
+
+PERF = PerfRecorder()
+
+
+# -------------------------------
+# HOOKS
+# -------------------------------
+@contextmanager
+def page(name):
+    # Also usable as a decorator: every event inside is tagged with the
+    # page and the whole page run is recorded as a "page" event
+    token = _page.set(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PERF.record("page", name, (time.perf_counter() - start) * 1000)
+        _page.reset(token)
+
+
+@contextmanager
+def timed(stage, name, **fields):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PERF.record(stage, name, (time.perf_counter() - start) * 1000, **fields)
+
+
+def record_query(name, sql, rows, ms, cached, db_ms=0.0, df_ms=0.0):
+    PERF.record("query", name, ms, sql=sql, rows=rows, cached=cached,
+                db_ms=round(db_ms, 3), df_ms=round(df_ms, 3))
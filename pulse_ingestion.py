@@ -0,0 +1,361 @@
+import os
+import json
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from ingest_manifest import load_manifest, save_manifest, diff_manifest
+
+DATA_DIR = "dataset/data"
+OUTPUT_DIR = "dataframes"
+
+
+# -----------------------------------
+# EXTRACTORS (one per table kind)
+# Each one receives the parsed JSON document of a single
+# state/year/quarter file and returns the value columns per row.
+# -----------------------------------
+def extract_aggregated_transaction(doc):
+    rows = []
+    for z in doc["data"]["transactionData"]:
+        instrument = z["paymentInstruments"][0]
+        rows.append((z["name"], instrument["count"], instrument["amount"]))
+    return rows
+
+
+def extract_aggregated_user(doc):
+    users = doc["data"]["usersByDevice"]
+    if users is None:  # Some json files return None users
+        return []
+    return [(z["brand"], z["count"], z["percentage"]) for z in users]
+
+
+def extract_aggregated_insurance(doc):
+    ins = doc["data"]["transactionData"]
+    if ins is None:
+        return []
+    rows = []
+    for z in ins:
+        instrument = z["paymentInstruments"][0]
+        rows.append((instrument["count"], instrument["amount"]))
+    return rows
+
+
+def extract_map_hover_list(doc):
+    hover = doc["data"]["hoverDataList"]
+    if hover is None:
+        return []
+    return [
+        (clean_district(z["name"]), z["metric"][0]["count"], z["metric"][0]["amount"])
+        for z in hover
+    ]
+
+
+def extract_map_user(doc):
+    hover = doc["data"].get("hoverData")
+    if hover is None:
+        return []
+    return [
+        (clean_district(district), values["registeredUsers"])
+        for district, values in hover.items()
+    ]
+
+
+def extract_top_districts(doc):
+    districts = doc["data"].get("districts")
+    if districts is None:
+        return []
+    return [
+        (clean_district(z["entityName"]), z["metric"]["count"], z["metric"]["amount"])
+        for z in districts
+    ]
+
+
+def extract_top_user(doc):
+    districts = doc["data"].get("districts")
+    if districts is None:
+        return []
+    return [
+        (clean_district(z["name"]), z["registeredUsers"])
+        for z in districts
+    ]
+
+
+def clean_district(name):
+    return name.replace(" district", "")
+
+
+# -----------------------------------
+# TABLE SPECS
+# table name -> (state folder under DATA_DIR, columns, extractor)
+# -----------------------------------
+KEY_COLUMNS = ["State", "Year", "Quarter"]
+
+TABLES = {
+    "aggregated_transaction": (
+        "aggregated/transaction/country/india/state",
+        KEY_COLUMNS + ["Transaction_Type", "Transaction_Count", "Transaction_Amount"],
+        extract_aggregated_transaction,
+    ),
+    "aggregated_user": (
+        "aggregated/user/country/india/state",
+        KEY_COLUMNS + ["User_Device", "User_Count", "User_Share"],
+        extract_aggregated_user,
+    ),
+    "aggregated_insurance": (
+        "aggregated/insurance/country/india/state",
+        KEY_COLUMNS + ["Insurance_Count", "Insurance_Amount"],
+        extract_aggregated_insurance,
+    ),
+    "map_transaction": (
+        "map/transaction/hover/country/india/state",
+        KEY_COLUMNS + ["District", "Transaction_Count", "Transaction_Amount"],
+        extract_map_hover_list,
+    ),
+    "map_insurance": (
+        "map/insurance/hover/country/india/state",
+        KEY_COLUMNS + ["District", "Insurance_Count", "Insurance_Amount"],
+        extract_map_hover_list,
+    ),
+    "map_user": (
+        "map/user/hover/country/india/state",
+        KEY_COLUMNS + ["District", "User_Count"],
+        extract_map_user,
+    ),
+    "top_transaction": (
+        "top/transaction/country/india/state",
+        KEY_COLUMNS + ["District", "Transaction_Count", "Transaction_Amount"],
+        extract_top_districts,
+    ),
+    "top_insurance": (
+        "top/insurance/country/india/state",
+        KEY_COLUMNS + ["District", "Insurance_Count", "Insurance_Amount"],
+        extract_top_districts,
+    ),
+    "top_user": (
+        "top/user/country/india/state",
+        KEY_COLUMNS + ["District", "Registered_Users"],
+        extract_top_user,
+    ),
+}
+
+
+def table_columns(table_name):
+    return TABLES[table_name][1]
+
+
+# -----------------------------------
+# FILE DISCOVERY
+# Walks <state>/<year>/<quarter>.json in sorted order so the output
+# row order is stable between runs and machines.
+# -----------------------------------
+def list_files(table_name, data_dir=DATA_DIR):
+    state_root = os.path.join(data_dir, TABLES[table_name][0])
+    files = []
+    for state in sorted(os.listdir(state_root)):
+        state_path = os.path.join(state_root, state)
+        for year in sorted(os.listdir(state_path)):
+            year_path = os.path.join(state_path, year)
+            for name in sorted(os.listdir(year_path)):
+                if not name.endswith(".json"):
+                    continue
+                quarter = int(name[:-len(".json")])
+                files.append((table_name, os.path.join(year_path, name), state, int(year), quarter))
+    return files
+
+
+# -----------------------------------
+# PARSING
+# -----------------------------------
+def parse_file(task):
+    table_name, path, state, year, quarter = task
+    with open(path, "r") as f:
+        doc = json.load(f)
+    extractor = TABLES[table_name][2]
+    return [(state, year, quarter) + values for values in extractor(doc)]
+
+
+def parse_files(tasks, workers=None):
+    # Returns one list of rows per task, in task order.
+    if workers == 1:
+        return [parse_file(task) for task in tasks]
+
+    chunksize = max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(parse_file, tasks, chunksize=chunksize))
+
+
+def iter_parsed(tasks, workers=None, window=64):
+    # Lazily yields one list of rows per task, in task order. At most
+    # `window` files are in flight, so memory does not grow with the
+    # number of files however slow the consumer is.
+    if workers == 1:
+        for task in tasks:
+            yield parse_file(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(parse_file, task))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_record_chunks(table_name, data_dir=DATA_DIR, chunk_size=5000, workers=None):
+    # Yields lists of at most chunk_size row tuples for one table
+    chunk = []
+    for rows in iter_parsed(list_files(table_name, data_dir), workers):
+        chunk.extend(rows)
+        while len(chunk) >= chunk_size:
+            yield chunk[:chunk_size]
+            chunk = chunk[chunk_size:]
+    if chunk:
+        yield chunk
+
+
+def build_dataframe(table_name, data_dir=DATA_DIR, workers=None):
+    results = parse_files(list_files(table_name, data_dir), workers)
+    rows = [row for rows in results for row in rows]
+    return pd.DataFrame(rows, columns=table_columns(table_name))
+
+
+def build_all(data_dir=DATA_DIR, tables=None, workers=None):
+    # All files of all requested tables go through one pool, so small
+    # tables do not leave workers idle while a big one is still parsing.
+    tables = list(tables or TABLES)
+    tasks = [task for table_name in tables for task in list_files(table_name, data_dir)]
+    results = parse_files(tasks, workers)
+
+    per_table = {table_name: [] for table_name in tables}
+    for task, rows in zip(tasks, results):
+        per_table[task[0]].extend(rows)
+
+    return {
+        table_name: pd.DataFrame(per_table[table_name], columns=table_columns(table_name))
+        for table_name in tables
+    }
+
+
+def write_csvs(frames, output_dir=OUTPUT_DIR, parquet=False):
+    os.makedirs(output_dir, exist_ok=True)
+    for table_name, df in frames.items():
+        df.to_csv(os.path.join(output_dir, f"{table_name}.csv"), index=False)
+        if parquet:
+            from snapshots import write_snapshot
+            write_snapshot(table_name, df, output_dir)
+        print(f"✅ {table_name}: {len(df)} rows")
+
+
+# -----------------------------------
+# INCREMENTAL INGESTION
+# Only files that are new or whose content changed since the last
+# manifest are parsed. Their (State, Year, Quarter) slices are then
+# swapped into the CSVs (and optionally MySQL); files that disappeared
+# drop their slice.
+# -----------------------------------
+def replace_csv_slices(csv_path, df_new, slices):
+    if os.path.exists(csv_path):
+        df_old = pd.read_csv(csv_path, float_precision="round_trip")
+        stale = df_old.set_index(KEY_COLUMNS).index.isin(list(slices))
+        df_old = df_old[~stale]
+        df = pd.concat([df_old, df_new], ignore_index=True)
+    else:
+        df = df_new
+
+    # Stable sort keeps the per-file row order, so the result matches a full rebuild
+    df = df.sort_values(KEY_COLUMNS, kind="mergesort").reset_index(drop=True)
+    df.to_csv(csv_path, index=False)
+    return df
+
+
+def ingest_incremental(data_dir=DATA_DIR, output_dir=OUTPUT_DIR, tables=None,
+                       workers=None, manifest_path=None, to_mysql=False):
+    tables = list(tables or TABLES)
+    manifest_path = manifest_path or os.path.join(output_dir, "ingest_manifest.json")
+
+    manifest = load_manifest(manifest_path)
+    other_tables = {k: v for k, v in manifest.items() if v["table"] not in tables}
+    manifest = {k: v for k, v in manifest.items() if v["table"] in tables}
+
+    tasks = [task for table_name in tables for task in list_files(table_name, data_dir)]
+    changed, removed, new_manifest = diff_manifest(tasks, manifest, data_dir)
+
+    slices = {table_name: set() for table_name in tables}
+    for table_name, path, state, year, quarter in changed:
+        slices[table_name].add((state, year, quarter))
+    for entry in removed:
+        slices[entry["table"]].add((entry["state"], entry["year"], entry["quarter"]))
+
+    # A pool is not worth starting for a handful of files
+    results = parse_files(changed, workers if len(changed) > 100 else 1)
+    rows = {table_name: [] for table_name in tables}
+    for task, task_rows in zip(changed, results):
+        rows[task[0]].extend(task_rows)
+
+    os.makedirs(output_dir, exist_ok=True)
+    for table_name in tables:
+        if not slices[table_name]:
+            continue
+        df_new = pd.DataFrame(rows[table_name], columns=table_columns(table_name))
+        df = replace_csv_slices(os.path.join(output_dir, f"{table_name}.csv"), df_new, slices[table_name])
+
+        # Keep an existing Parquet snapshot in step with its CSV
+        if os.path.exists(os.path.join(output_dir, f"{table_name}.parquet")):
+            from snapshots import write_snapshot
+            write_snapshot(table_name, df, output_dir)
+
+        if to_mysql:
+            from data_loader import replace_slices
+            replace_slices(table_name, table_columns(table_name), df_new, slices[table_name])
+
+        print(f"✅ {table_name}: {len(slices[table_name])} slices, {len(df_new)} rows re-parsed")
+
+    if to_mysql and any(slices.values()):
+        from rollups import build_rollups
+        build_rollups()
+
+    # Saved last, so a failed run is simply retried from the old manifest
+    new_manifest.update(other_tables)
+    save_manifest(new_manifest, manifest_path)
+    print(f"🔄 {len(changed)} changed, {len(removed)} removed, "
+          f"{len(tasks) - len(changed)} unchanged files")
+    return slices
+
+
+# -----------------------------------
+# CLI
+# -----------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Build the PhonePe Pulse dataframes from dataset/data")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Parser processes (default: CPU count, 1 = no pool)")
+    parser.add_argument("--tables", nargs="+", choices=list(TABLES), default=None)
+    parser.add_argument("--parquet", action="store_true",
+                        help="Also write typed <table>.parquet snapshots")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-parse files that changed since the last manifest")
+    parser.add_argument("--manifest", default=None,
+                        help="Manifest path (default: <output-dir>/ingest_manifest.json)")
+    parser.add_argument("--mysql", action="store_true",
+                        help="With --incremental, also apply the changed slices to MySQL")
+    args = parser.parse_args()
+
+    if args.incremental:
+        ingest_incremental(args.data_dir, args.output_dir, args.tables,
+                           args.workers, args.manifest, args.mysql)
+        return
+
+    frames = build_all(args.data_dir, args.tables, args.workers)
+    write_csvs(frames, args.output_dir, args.parquet)
+    print("🎉 ALL DATAFRAMES WRITTEN")
+
+
+if __name__ == "__main__":
+    main()
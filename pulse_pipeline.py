@@ -0,0 +1,99 @@
+import os
+import time
+import argparse
+
+import pandas as pd
+from db_config import get_connection
+from data_loader import insert_rows, DEFAULT_BATCH_SIZE
+from db_partitions import PARTITIONED_TABLES, ensure_partitions
+from rollups import build_rollups
+from pulse_ingestion import DATA_DIR, TABLES, table_columns, list_files, iter_record_chunks
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+# -----------------------------------
+# STREAMING PIPELINE
+# dataset/data JSON -> bounded chunks of rows -> MySQL, with the CSV
+# file as an optional second sink. Only one chunk per table is held
+# in memory at any time.
+# -----------------------------------
+def stream_table(table_name, data_dir=DATA_DIR, chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+                 to_mysql=True, csv_dir=None, batch_size=DEFAULT_BATCH_SIZE):
+    start = time.perf_counter()
+    columns = table_columns(table_name)
+
+    conn = cursor = csv_file = None
+    if to_mysql:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("USE phonepe_db")
+        if table_name in PARTITIONED_TABLES:
+            ensure_partitions(cursor, table_name, {task[3] for task in list_files(table_name, data_dir)})
+    if csv_dir:
+        os.makedirs(csv_dir, exist_ok=True)
+        csv_path = os.path.join(csv_dir, f"{table_name}.csv")
+        csv_file = open(csv_path + ".tmp", "w", newline="")
+
+    rows = 0
+    try:
+        for chunk in iter_record_chunks(table_name, data_dir, chunk_size, workers):
+            if cursor is not None:
+                insert_rows(cursor, table_name, columns, chunk, batch_size)
+            if csv_file is not None:
+                pd.DataFrame(chunk, columns=columns).to_csv(csv_file, header=(rows == 0), index=False)
+            rows += len(chunk)
+
+        if csv_file is not None and rows == 0:
+            pd.DataFrame(columns=columns).to_csv(csv_file, index=False)
+        if conn is not None:
+            conn.commit()
+    except Exception:
+        if conn is not None:
+            conn.rollback()
+        raise
+    finally:
+        if cursor is not None:
+            cursor.close()
+            conn.close()
+        if csv_file is not None:
+            csv_file.close()
+
+    # The CSV only replaces the old one once the whole table went through
+    if csv_file is not None:
+        os.replace(csv_path + ".tmp", csv_path)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Streamed {rows} rows for {table_name} in {elapsed:.2f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream dataset/data straight into MySQL")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--tables", nargs="+", choices=list(TABLES), default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--csv-dir", default=None,
+                        help="Also write <table>.csv files into this folder")
+    parser.add_argument("--no-mysql", action="store_true",
+                        help="Only write the CSV sink")
+    args = parser.parse_args()
+
+    if args.no_mysql and not args.csv_dir:
+        parser.error("--no-mysql needs --csv-dir")
+
+    for table_name in args.tables or TABLES:
+        stream_table(table_name, args.data_dir, args.chunk_size, args.workers,
+                     to_mysql=not args.no_mysql, csv_dir=args.csv_dir,
+                     batch_size=args.batch_size)
+
+    if not args.no_mysql:
+        build_rollups()
+    print("🎉 PIPELINE FINISHED")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import textwrap
+import time
+import weakref
+
+import pandas as pd
+
+from memory_backend import MemoryStore
+from pulse_ingestion import TABLES
+from perf import record_query
+from query_cache import QUERY_CACHE
+
+# -------------------------------
+# NAMED DASHBOARD QUERIES
+# Every query the dashboard runs, as "<page>.<name>": (sql, parameter
+# names). Values are always bound, never formatted into the SQL, so
+# MySQL prepares each shape once per connection and reuses the plan for
+# every year / quarter / category.
+# -------------------------------
+QUERIES = {
+    # ---------- SIDEBAR ----------
+    "filters.years": ("""
+        SELECT DISTINCT Year FROM aggregated_transaction ORDER BY Year""", ()),
+    "filters.quarters": ("""
+        SELECT DISTINCT Quarter FROM aggregated_transaction ORDER BY Quarter""", ()),
+    "filters.latest_period": ("""
+        SELECT Year, Quarter FROM aggregated_transaction
+        ORDER BY Year DESC, Quarter DESC LIMIT 1""", ()),
+
+    # ---------- HOME / REPORTS ----------
+    "home.totals": ("""
+        SELECT Total_Count, Total_Amount FROM rollup_totals
+        WHERE Category=%s AND Year=%s AND Quarter=%s""",
+        ("category", "year", "quarter")),
+    "home.state_map": ("""
+        SELECT s.State_Name AS State, r.Total_Count, r.Total_Amount
+        FROM rollup_state r JOIN dim_state s ON s.State_ID = r.State_ID
+        WHERE r.Category=%s AND r.Year=%s AND r.Quarter=%s""",
+        ("category", "year", "quarter")),
+    "home.top_states": ("""
+        SELECT s.State_Name AS State, r.Total_Count, r.Total_Amount
+        FROM rollup_state r JOIN dim_state s ON s.State_ID = r.State_ID
+        WHERE r.Category=%s AND r.Year=%s AND r.Quarter=%s AND r.State_Rank <= 10
+        ORDER BY r.State_Rank""",
+        ("category", "year", "quarter")),
+    "home.top_districts": ("""
+        SELECT d.District, r.Total_Count, r.Total_Amount
+        FROM rollup_top_districts r JOIN dim_district d ON d.District_ID = r.District_ID
+        WHERE r.Category=%s AND r.Year=%s AND r.Quarter=%s
+        ORDER BY r.District_Rank""",
+        ("category", "year", "quarter")),
+    "reports.totals": ("""
+        SELECT Year, Quarter, Total_Count, Total_Amount FROM rollup_totals
+        WHERE Category=%s
+        ORDER BY Year, Quarter""",
+        ("category",)),
+    "home.devices": ("""
+        SELECT User_Device, SUM(User_Count) users
+        FROM aggregated_user
+        WHERE Year=%s AND Quarter=%s
+        GROUP BY User_Device
+        ORDER BY users DESC""",
+        ("year", "quarter")),
+
+    # ---------- BUSINESS CASES (fact tables) ----------
+    "business.transaction_types": ("""
+        SELECT Transaction_Type, SUM(Transaction_Count) count
+        FROM aggregated_transaction
+        WHERE Year=%s AND Quarter=%s
+        GROUP BY Transaction_Type""",
+        ("year", "quarter")),
+    "business.insurance_states": ("""
+        SELECT s.State_Name AS State, SUM(i.Insurance_Amount) amt
+        FROM aggregated_insurance i
+        JOIN dim_state s ON s.State_ID = i.State_ID
+        WHERE i.Year=%s AND i.Quarter=%s
+        GROUP BY i.State_ID
+        ORDER BY amt DESC""",
+        ("year", "quarter")),
+    "business.transaction_districts": ("""
+        SELECT d.District, SUM(t.Transaction_Amount) amt
+        FROM map_transaction t
+        JOIN dim_district d ON d.District_ID = t.District_ID
+        WHERE t.Year=%s AND t.Quarter=%s
+        GROUP BY t.District_ID
+        ORDER BY amt DESC
+        LIMIT 10""",
+        ("year", "quarter")),
+    "business.user_districts": ("""
+        SELECT d.District, u.User_Count
+        FROM map_user u
+        JOIN dim_district d ON d.District_ID = u.District_ID
+        WHERE u.Year=%s AND u.Quarter=%s
+        ORDER BY u.User_Count DESC
+        LIMIT 10""",
+        ("year", "quarter")),
+}
+
+# ---------- DATABASE PAGE ----------
+# Table names cannot be bound, so there is one fixed query per table
+for table_name in TABLES:
+    QUERIES[f"database.sample_{table_name}"] = (f"SELECT * FROM {table_name} LIMIT 5", ())
+
+
+def query_sql(name):
+    return QUERIES[name][0]
+
+
+def sql_shape(name):
+    # One-line SQL for logs and the Performance page
+    return " ".join(query_sql(name).split()).replace("%s", "?")
+
+
+def display_sql(name):
+    # The SQL as shown on the dashboard, with ? for bound values
+    return textwrap.dedent(query_sql(name)).strip().replace("%s", "?")
+
+
+# -------------------------------
+# PREPARED STATEMENTS
+# One prepared cursor per (connection, query). A prepared cursor only
+# re-prepares when it is handed a different SQL string object, so
+# executing the same registry string again just binds new values.
+# Statements live as long as the server session: a reconnect gives a
+# new connection_id and the cursors are prepared again. A pool with
+# reset_session=True frees them every time a connection goes back
+# (COM_RESET_CONNECTION keeps the connection_id), so there they only
+# last one borrow.
+# -------------------------------
+_statements = weakref.WeakKeyDictionary()
+
+
+def statement_session(conn, raw):
+    pool = getattr(conn, "_cnx_pool", None)
+    if pool is not None and pool.reset_session:
+        # Each borrow gets a new wrapper; a dead reference never matches
+        return weakref.ref(conn)
+    return raw.connection_id
+
+
+def prepared_cursor(conn, name):
+    # Pooled connections wrap the real connection object
+    raw = getattr(conn, "_cnx", conn)
+    session = statement_session(conn, raw)
+    stored, cursors = _statements.get(raw, (None, None))
+    if stored != session:
+        cursors = {}
+        _statements[raw] = (session, cursors)
+    cursor = cursors.get(name)
+    if cursor is None:
+        cursor = cursors[name] = raw.cursor(prepared=True)
+    return cursor
+
+
+def execute(conn, name, params, timing=None):
+    # timing (optional dict) receives db_ms and df_ms
+    timing = {} if timing is None else timing
+    start = time.perf_counter()
+    if isinstance(conn, MemoryStore):
+        df = conn.query(name, params)
+        timing["db_ms"] = (time.perf_counter() - start) * 1000
+        timing["df_ms"] = 0.0
+        return df
+
+    sql = query_sql(name)
+    cursor = prepared_cursor(conn, name)
+    try:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    except Exception:
+        # Never reuse a cursor that failed mid-statement
+        _statements.pop(getattr(conn, "_cnx", conn), None)
+        raise
+    fetched = time.perf_counter()
+    columns = [d[0] for d in cursor.description]
+    df = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+    timing["db_ms"] = (fetched - start) * 1000
+    timing["df_ms"] = (time.perf_counter() - fetched) * 1000
+    return df
+
+
+def bind(value):
+    # numpy scalars from DataFrames / selectboxes -> plain Python
+    return value.item() if hasattr(value, "item") else value
+
+
+# -------------------------------
+# QUERY API
+# api = DashboardQueries(source), source being a db_config.ConnectionPool,
+# a connection or a memory_backend.MemoryStore
+# api.home.top_states("Transactions", 2024, 4)
+# -------------------------------
+class QueryGroup:
+    def __init__(self, api, group):
+        self._api = api
+        self._group = group
+
+    def __getattr__(self, name):
+        full_name = f"{self._group}.{name}"
+        if full_name not in QUERIES:
+            raise AttributeError(f"unknown query {full_name}")
+        return lambda *args: self._api.run(full_name, *args)
+
+
+class DashboardQueries:
+    def __init__(self, source, cache=QUERY_CACHE):
+        self.source = source
+        self.cache = cache
+
+    def __getattr__(self, group):
+        if not any(name.startswith(group + ".") for name in QUERIES):
+            raise AttributeError(f"unknown query group {group}")
+        return QueryGroup(self, group)
+
+    def data_version(self):
+        return self.cache.data_version(self.source)
+
+    def run(self, name, *args):
+        param_names = QUERIES[name][1]
+        if len(args) != len(param_names):
+            raise TypeError(f"{name}() takes ({', '.join(param_names)}), got {len(args)} values")
+        params = tuple(bind(value) for value in args)
+
+        timing = {}
+        start = time.perf_counter()
+        df = self.cache.cached((name, params), self.source,
+                               lambda conn: execute(conn, name, params, timing))
+        record_query(name, sql_shape(name), len(df), (time.perf_counter() - start) * 1000,
+                     cached=not timing, **timing)
+        return df
@@ -0,0 +1,136 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+from db_config import run_with_connection
+
+load_dotenv()
+
+# -------------------------------
+# DATA VERSION
+# A single-row table the loaders bump after every publish. Cached
+# results are keyed on it, so a reload invalidates them automatically.
+# The version is the publish time in microseconds (or the previous
+# version + 1 if that is larger), not a counter from 1: a recreated
+# database must never repeat a version that map files on disk
+# (map_figures.FigureCache) were written under.
+# -------------------------------
+DATA_VERSION_DDL = """
+CREATE TABLE IF NOT EXISTS data_version (
+    id TINYINT PRIMARY KEY,
+    version BIGINT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+)
+"""
+
+
+def create_data_version_table(cursor):
+    cursor.execute(DATA_VERSION_DDL)
+
+
+def bump_data_version(cursor):
+    create_data_version_table(cursor)
+    cursor.execute("""
+    INSERT INTO data_version (id, version) VALUES (1, %s)
+    ON DUPLICATE KEY UPDATE version = GREATEST(version + 1, VALUES(version))
+    """, (time.time_ns() // 1000,))
+
+
+def read_data_version(conn):
+    # End any open transaction first, otherwise a long-lived connection
+    # keeps reading the REPEATABLE READ snapshot it started with
+    conn.commit()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT version FROM data_version WHERE id = 1")
+        row = cursor.fetchone()
+    except Exception:
+        # Databases loaded before data_version existed
+        row = None
+    finally:
+        cursor.close()
+    return row[0] if row else 0
+
+
+# -------------------------------
+# QUERY CACHE
+# Bounded LRU of DataFrames keyed by (sql, params, data_version), with a
+# TTL as a safety net. The data version itself is only re-read from the
+# database every `version_check_interval` seconds.
+# -------------------------------
+class QueryCache:
+    def __init__(self, maxsize=512, ttl=3600, version_check_interval=5):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def data_version(self, source):
+        now = time.monotonic()
+        if self._version is None or now - self._version_checked_at >= self.version_check_interval:
+            if hasattr(source, "data_version"):
+                # The in-memory backend versions its own snapshots
+                version = source.data_version()
+            else:
+                version = run_with_connection(source, read_data_version)
+            with self._lock:
+                if version != self._version:
+                    # Entries of older versions can never be hit again
+                    self._entries.clear()
+                self._version = version
+                self._version_checked_at = now
+        return self._version
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def cached(self, key, source, load):
+        # source is a db_config.ConnectionPool (a connection is borrowed
+        # per query) or a plain connection; load(conn) returns a DataFrame
+        key = (key, self.data_version(source))
+        df = self.get(key)
+        if df is None:
+            df = run_with_connection(source, load)
+            self.put(key, df)
+        # Callers add display columns to the result, so never hand out
+        # the cached frame itself
+        return df.copy()
+
+
+QUERY_CACHE = QueryCache(
+    maxsize=int(os.getenv("QUERY_CACHE_SIZE", 512)),
+    ttl=float(os.getenv("QUERY_CACHE_TTL", 3600)),
+    version_check_interval=float(os.getenv("QUERY_CACHE_VERSION_CHECK", 5)),
+)
@@ -0,0 +1,310 @@
+import io
+import os
+import re
+import csv
+import html
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from dotenv import load_dotenv
+
+from db_config import get_data_source
+from formatting import format_count, format_crore, format_lakh
+from perf import timed
+from queries import DashboardQueries
+
+load_dotenv()
+
+# -------------------------------
+# QUARTERLY PDF REPORTS
+# One PDF per (category, year, quarter), the same document the Reports
+# page offers for download. The report text only needs that quarter's
+# category totals (home.totals / reports.totals).
+# -------------------------------
+REPORT_CATEGORIES = ["Transactions", "Users", "Insurance"]
+REPORT_DIR = os.path.join("exports", "reports")
+REPORT_CACHE_MB = float(os.getenv("REPORT_CACHE_MB", 32))
+
+
+def report_filename(category, year, quarter):
+    return f"PhonePe_{category}_Q{quarter}_{year}.pdf"
+
+
+def narrative(category, year, quarter, total_count, total_amount):
+    if category == "Transactions":
+        return (
+            f"In Q{quarter} {year}, PhonePe recorded "
+            f"{format_count(total_count)} transactions "
+            f"with a total value of {format_crore(total_amount)}. "
+            "Transaction activity was concentrated in top-performing states."
+        )
+    if category == "Users":
+        return (
+            f"In Q{quarter} {year}, PhonePe had "
+            f"{format_count(total_count)} registered users. "
+            "Android devices continued to dominate user adoption."
+        )
+    return (
+        f"In Q{quarter} {year}, insurance transactions reached "
+        f"{format_lakh(total_amount)} in value. "
+        "Adoption remains concentrated in select states."
+    )
+
+
+def render_pdf(target, category, year, quarter, summary):
+    # target is a file path or a binary file object
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(target, pagesize=A4)
+    text = c.beginText(40, 800)
+    text.setFont("Helvetica", 11)
+
+    text.textLine("PhonePe Pulse – Quarterly Analytics Report")
+    text.textLine("-" * 50)
+    text.textLine(f"Category: {category}")
+    text.textLine(f"Year: {year}, Quarter: Q{quarter}")
+    text.textLine("")
+    text.textLine("Executive Summary:")
+    text.textLine(summary)
+    text.textLine("")
+    text.textLine("This report is generated automatically using")
+    text.textLine("MySQL + Python + Streamlit from PhonePe Pulse data.")
+
+    c.drawText(text)
+    c.showPage()
+    c.save()
+
+
+def render_pdf_bytes(category, year, quarter, summary):
+    buffer = io.BytesIO()
+    render_pdf(buffer, category, year, quarter, summary)
+    return buffer.getvalue()
+
+
+# -------------------------------
+# REPORT CACHE
+# Rendered PDFs kept in memory, keyed by (category, year, quarter,
+# data_version), so a repeat download is served without rendering and
+# nothing is written to disk. The least recently used reports are
+# evicted once their total size passes max_bytes; a new data version
+# drops all of them.
+# -------------------------------
+class ReportCache:
+    def __init__(self, max_bytes=int(REPORT_CACHE_MB * 1024 * 1024)):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._reports = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+
+    def get_or_render(self, key, render):
+        version = key[-1]
+        with self._lock:
+            if version != self._version:
+                self._reports.clear()
+                self.size = 0
+                self._version = version
+            pdf = self._reports.get(key)
+            if pdf is not None:
+                self._reports.move_to_end(key)
+                return pdf
+
+        pdf = render()
+
+        with self._lock:
+            if version == self._version and key not in self._reports:
+                self._reports[key] = pdf
+                self.size += len(pdf)
+                while self.size > self.max_bytes and self._reports:
+                    _, evicted = self._reports.popitem(last=False)
+                    self.size -= len(evicted)
+        return pdf
+
+
+REPORT_CACHE = ReportCache()
+
+
+def report_pdf(api, category, year, quarter, summary):
+    # api is a queries.DashboardQueries; returns the PDF as bytes
+    year, quarter = int(year), int(quarter)
+    key = (category, year, quarter, api.data_version())
+    def render():
+        with timed("render", f"report_pdf.{category}"):
+            return render_pdf_bytes(category, year, quarter, summary)
+
+    return REPORT_CACHE.get_or_render(key, render)
+
+
+# -------------------------------
+# BATCH GENERATION
+# All totals are fetched up front (one reports.totals query per
+# category), then only the rendering is spread over a process pool.
+# Output: <out_dir>/<Category>/PhonePe_<Category>_Q<q>_<year>.pdf plus
+# index.csv and index.html listing every report. rollup_totals has a row
+# for every period, zero-filled where the category has no source rows
+# (Users from 2022 Q2, Insurance before 2020), so those are skipped.
+# Re-running a range replaces its reports and merges them into the
+# existing index; stale PDFs inside the range are removed.
+# -------------------------------
+def parse_period(value):
+    # "2023Q4" / "2023-Q4" -> (2023, 4)
+    year, quarter = value.upper().replace("-", "").split("Q")
+    return int(year), int(quarter)
+
+
+def in_range(year, quarter, start=None, end=None):
+    return not ((start and (year, quarter) < start) or (end and (year, quarter) > end))
+
+
+def prefetch_totals(api, categories):
+    # {category: {(year, quarter): (Total_Count, Total_Amount)}}
+    totals = {}
+    for category in categories:
+        df = api.reports.totals(category)
+        totals[category] = {
+            (int(row.Year), int(row.Quarter)): (row.Total_Count, row.Total_Amount)
+            for row in df.itertuples()
+        }
+    return totals
+
+
+def report_tasks(totals, out_dir, start=None, end=None):
+    tasks = []
+    for category, periods in totals.items():
+        for (year, quarter), (total_count, total_amount) in sorted(periods.items()):
+            if not in_range(year, quarter, start, end) or not total_count:
+                continue
+            path = os.path.join(out_dir, category, report_filename(category, year, quarter))
+            tasks.append((path, category, year, quarter,
+                          narrative(category, year, quarter, total_count, total_amount)))
+    return tasks
+
+
+def render_task(task):
+    path, category, year, quarter, summary = task
+    render_pdf(path, category, year, quarter, summary)
+    return os.path.getsize(path)
+
+
+def render_all(tasks, workers=None):
+    # Returns the size of every PDF, in task order
+    for directory in {os.path.dirname(task[0]) for task in tasks}:
+        os.makedirs(directory, exist_ok=True)
+    if workers == 1:
+        return [render_task(task) for task in tasks]
+
+    chunksize = max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(render_task, tasks, chunksize=chunksize))
+
+
+def remove_stale(out_dir, categories, tasks, start=None, end=None):
+    # PDFs in the range that this run did not produce, e.g. the zero
+    # reports earlier versions wrote for periods without data
+    keep = {os.path.normpath(task[0]) for task in tasks}
+    removed = 0
+    for category in categories:
+        folder = os.path.join(out_dir, category)
+        if not os.path.isdir(folder):
+            continue
+        pattern = re.compile(rf"PhonePe_{re.escape(category)}_Q(\d)_(\d{{4}})\.pdf")
+        for name in os.listdir(folder):
+            match = pattern.fullmatch(name)
+            path = os.path.normpath(os.path.join(folder, name))
+            if match and path not in keep and in_range(int(match[2]), int(match[1]), start, end):
+                os.remove(path)
+                removed += 1
+    return removed
+
+
+def read_index(out_dir):
+    path = os.path.join(out_dir, "index.csv")
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        for column in ("year", "quarter", "bytes"):
+            row[column] = int(row[column])
+    return rows
+
+
+def write_index(out_dir, tasks, sizes):
+    # Merged with the existing index: rows of this run replace rows for the
+    # same file, rows whose PDF no longer exists are dropped
+    rows = [
+        {"category": category, "year": year, "quarter": quarter,
+         "file": os.path.relpath(path, out_dir).replace(os.sep, "/"), "bytes": size, "summary": summary}
+        for (path, category, year, quarter, summary), size in zip(tasks, sizes)
+    ]
+    written = {r["file"] for r in rows}
+    rows += [r for r in read_index(out_dir)
+             if r["file"] not in written and os.path.exists(os.path.join(out_dir, r["file"]))]
+    order = {category: i for i, category in enumerate(REPORT_CATEGORIES)}
+    rows.sort(key=lambda r: (order.get(r["category"], len(order)), r["category"], r["year"], r["quarter"]))
+
+    with open(os.path.join(out_dir, "index.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["category", "year", "quarter", "file", "bytes", "summary"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+    table = "\n".join(
+        f"<tr><td>{html.escape(r['category'])}</td><td>{r['year']}</td><td>Q{r['quarter']}</td>"
+        f"<td><a href=\"{html.escape(r['file'])}\">{html.escape(os.path.basename(r['file']))}</a></td>"
+        f"<td>{html.escape(r['summary'])}</td></tr>"
+        for r in rows
+    )
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(
+            "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+            "<title>PhonePe Pulse – Quarterly Reports</title></head><body>\n"
+            "<h1>PhonePe Pulse – Quarterly Reports</h1>\n"
+            "<table border=\"1\" cellpadding=\"4\">\n"
+            "<tr><th>Category</th><th>Year</th><th>Quarter</th><th>Report</th><th>Summary</th></tr>\n"
+            f"{table}\n</table>\n</body></html>\n"
+        )
+    return rows
+
+
+def batch_reports(api, categories=None, start=None, end=None, out_dir=REPORT_DIR, workers=None):
+    total_start = time.perf_counter()
+    categories = categories or REPORT_CATEGORIES
+    totals = prefetch_totals(api, categories)
+    tasks = report_tasks(totals, out_dir, start, end)
+    removed = remove_stale(out_dir, categories, tasks, start, end)
+    if not tasks:
+        print("⚠️ No quarters with data in the selected range")
+        if removed:
+            write_index(out_dir, [], [])
+        return []
+
+    sizes = render_all(tasks, workers)
+    rows = write_index(out_dir, tasks, sizes)
+    print(f"📄 Wrote {len(tasks)} reports to {out_dir} in {time.perf_counter() - total_start:.2f}s "
+          f"(index.csv, index.html lists {len(rows)}"
+          + (f", removed {removed} stale" if removed else "") + ")")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the quarterly PDF reports for a range of quarters")
+    parser.add_argument("--categories", nargs="+", choices=REPORT_CATEGORIES, default=REPORT_CATEGORIES)
+    parser.add_argument("--from", dest="start", type=parse_period, default=None,
+                        help="First quarter, e.g. 2022Q1 (default: the first one loaded)")
+    parser.add_argument("--to", dest="end", type=parse_period, default=None,
+                        help="Last quarter, e.g. 2024Q4 (default: the latest one loaded)")
+    parser.add_argument("--out-dir", default=REPORT_DIR)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Rendering processes (default: one per CPU, 1 = no pool)")
+    args = parser.parse_args()
+
+    api = DashboardQueries(get_data_source(reset_session=False))
+    batch_reports(api, args.categories, args.start, args.end, args.out_dir, args.workers)
+
+
+if __name__ == "__main__":
+    main()
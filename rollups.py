@@ -0,0 +1,156 @@
+from db_config import get_connection
+from query_cache import bump_data_version
+
+# -------------------------------
+# ROLLUP TABLES
+# Precomputed per (Year, Quarter) summaries for the Home and Reports
+# pages: category totals, per-state sums with their rank, and the top
+# districts. They are rebuilt after every load, so the dashboard reads a
+# handful of rows instead of aggregating the fact tables on every click.
+# -------------------------------
+TOP_N = 10
+
+ROLLUP_TABLES = {
+    "rollup_totals": """
+    CREATE TABLE IF NOT EXISTS rollup_totals (
+        Year INT,
+        Quarter INT,
+        Category VARCHAR(20),
+        Total_Count BIGINT,
+        Total_Amount DOUBLE,
+        PRIMARY KEY (Year, Quarter, Category)
+    )
+    """,
+    "rollup_state": """
+    CREATE TABLE IF NOT EXISTS rollup_state (
+        Year INT,
+        Quarter INT,
+        Category VARCHAR(20),
+        State_ID SMALLINT,
+        Total_Count BIGINT,
+        Total_Amount DOUBLE,
+        State_Rank SMALLINT,
+        PRIMARY KEY (Year, Quarter, Category, State_ID),
+        KEY ix_yq_category_rank (Year, Quarter, Category, State_Rank)
+    )
+    """,
+    "rollup_top_districts": """
+    CREATE TABLE IF NOT EXISTS rollup_top_districts (
+        Year INT,
+        Quarter INT,
+        Category VARCHAR(20),
+        District_Rank SMALLINT,
+        District_ID INT,
+        Total_Count BIGINT,
+        Total_Amount DOUBLE,
+        PRIMARY KEY (Year, Quarter, Category, District_Rank)
+    )
+    """,
+}
+
+# category -> (state table, count column, amount column,
+#              district table, district count column, district amount column)
+# Users have no amount; they are ranked by count instead.
+CATEGORIES = {
+    "Transactions": ("aggregated_transaction", "Transaction_Count", "Transaction_Amount",
+                     "map_transaction", "Transaction_Count", "Transaction_Amount"),
+    "Users": ("aggregated_user", "User_Count", None,
+              "map_user", "User_Count", None),
+    "Insurance": ("aggregated_insurance", "Insurance_Count", "Insurance_Amount",
+                  "map_insurance", "Insurance_Count", "Insurance_Amount"),
+}
+
+
+def rollup_queries(category):
+    state_table, count_col, amount_col, district_table, d_count_col, d_amount_col = CATEGORIES[category]
+    amount = f"SUM({amount_col})" if amount_col else "NULL"
+    d_amount = f"SUM({d_amount_col})" if d_amount_col else "NULL"
+    total_amount = "COALESCE(g.amt, 0)" if amount_col else "NULL"
+    rank_by = "amt" if amount_col else "cnt"
+    d_rank_by = "amt" if d_amount_col else "cnt"
+
+    # Every period of the dashboard gets a totals row, even when the
+    # category has no data yet (insurance only starts in 2020)
+    totals = f"""
+    INSERT INTO rollup_totals__staging (Year, Quarter, Category, Total_Count, Total_Amount)
+    SELECT p.Year, p.Quarter, %s, COALESCE(g.cnt, 0), {total_amount}
+    FROM (SELECT DISTINCT Year, Quarter FROM aggregated_transaction) p
+    LEFT JOIN (
+        SELECT Year, Quarter, SUM({count_col}) cnt, {amount} amt
+        FROM {state_table} GROUP BY Year, Quarter
+    ) g ON g.Year = p.Year AND g.Quarter = p.Quarter
+    """
+
+    states = f"""
+    INSERT INTO rollup_state__staging
+        (Year, Quarter, Category, State_ID, Total_Count, Total_Amount, State_Rank)
+    SELECT Year, Quarter, %s, State_ID, cnt, amt,
+           ROW_NUMBER() OVER (PARTITION BY Year, Quarter ORDER BY {rank_by} DESC)
+    FROM (
+        SELECT Year, Quarter, State_ID, SUM({count_col}) cnt, {amount} amt
+        FROM {state_table} GROUP BY Year, Quarter, State_ID
+    ) g
+    """
+
+    districts = f"""
+    INSERT INTO rollup_top_districts__staging
+        (Year, Quarter, Category, District_Rank, District_ID, Total_Count, Total_Amount)
+    SELECT Year, Quarter, %s, district_rank, District_ID, cnt, amt
+    FROM (
+        SELECT Year, Quarter, District_ID, cnt, amt,
+               ROW_NUMBER() OVER (PARTITION BY Year, Quarter ORDER BY {d_rank_by} DESC) district_rank
+        FROM (
+            SELECT Year, Quarter, District_ID, SUM({d_count_col}) cnt, {d_amount} amt
+            FROM {district_table} GROUP BY Year, Quarter, District_ID
+        ) g
+    ) ranked
+    WHERE district_rank <= {TOP_N}
+    """
+    return [totals, states, districts]
+
+
+def create_rollup_tables(cursor):
+    for ddl in ROLLUP_TABLES.values():
+        cursor.execute(ddl)
+
+
+def build_rollups(conn=None):
+    # Built into staging copies and swapped in with one RENAME, so the
+    # dashboard never sees a half-built rollup
+    own_conn = conn is None
+    conn = conn or get_connection()
+    cursor = conn.cursor()
+    try:
+        create_rollup_tables(cursor)
+        for table_name in ROLLUP_TABLES:
+            cursor.execute(f"DROP TABLE IF EXISTS {table_name}__staging")
+            cursor.execute(f"CREATE TABLE {table_name}__staging LIKE {table_name}")
+
+        for category in CATEGORIES:
+            for sql in rollup_queries(category):
+                cursor.execute(sql, (category,))
+        conn.commit()
+
+        renames = ", ".join(
+            f"{t} TO {t}__old, {t}__staging TO {t}" for t in ROLLUP_TABLES
+        )
+        for table_name in ROLLUP_TABLES:
+            cursor.execute(f"DROP TABLE IF EXISTS {table_name}__old")
+        cursor.execute(f"RENAME TABLE {renames}")
+        for table_name in ROLLUP_TABLES:
+            cursor.execute(f"DROP TABLE {table_name}__old")
+
+        # Every load ends here, so this is where cached dashboard
+        # results get invalidated
+        bump_data_version(cursor)
+        conn.commit()
+    finally:
+        cursor.close()
+        if own_conn:
+            conn.close()
+
+    print(f"📈 Rebuilt {len(ROLLUP_TABLES)} rollup tables")
+
+
+if __name__ == "__main__":
+    build_rollups()
@@ -0,0 +1,102 @@
+import os
+import argparse
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pulse_ingestion import OUTPUT_DIR, TABLES, table_columns
+
+# -----------------------------------
+# COLUMN TYPES
+# Text columns with few distinct values are dictionary-encoded (they
+# come back as pandas categoricals), integers are downcast to the
+# smallest type with headroom for future quarters.
+# -----------------------------------
+COLUMN_TYPES = {
+    "State": pa.dictionary(pa.int8(), pa.string()),
+    "Year": pa.int16(),
+    "Quarter": pa.int8(),
+    "District": pa.dictionary(pa.int16(), pa.string()),
+    "Transaction_Type": pa.dictionary(pa.int8(), pa.string()),
+    "User_Device": pa.dictionary(pa.int8(), pa.string()),
+    "Transaction_Count": pa.int64(),   # exceeds 2^31 for large states
+    "Transaction_Amount": pa.float64(),
+    "Insurance_Count": pa.int32(),
+    "Insurance_Amount": pa.float64(),
+    "User_Count": pa.int32(),
+    "User_Share": pa.float64(),
+    "Registered_Users": pa.int32(),
+}
+
+CATEGORY_COLUMNS = [
+    name for name, dtype in COLUMN_TYPES.items() if pa.types.is_dictionary(dtype)
+]
+
+
+def table_schema(table_name):
+    return pa.schema([(column, COLUMN_TYPES[column]) for column in table_columns(table_name)])
+
+
+def snapshot_path(table_name, snapshot_dir=OUTPUT_DIR):
+    return os.path.join(snapshot_dir, f"{table_name}.parquet")
+
+
+def csv_path(table_name, snapshot_dir=OUTPUT_DIR):
+    return os.path.join(snapshot_dir, f"{table_name}.csv")
+
+
+# -----------------------------------
+# WRITE / READ
+# -----------------------------------
+def write_snapshot(table_name, df, snapshot_dir=OUTPUT_DIR):
+    df = df[table_columns(table_name)].copy()
+    for column in df.columns:
+        if column in CATEGORY_COLUMNS:
+            df[column] = df[column].astype(str).astype("category")
+
+    table = pa.Table.from_pandas(df, preserve_index=False).cast(table_schema(table_name))
+    path = snapshot_path(table_name, snapshot_dir)
+    pq.write_table(table, path + ".tmp", compression="zstd")
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def read_snapshot(table_name, snapshot_dir=OUTPUT_DIR, columns=None):
+    return pd.read_parquet(snapshot_path(table_name, snapshot_dir), columns=columns)
+
+
+def load_table(table_name, snapshot_dir=OUTPUT_DIR, columns=None):
+    # Parquet when it is at least as new as the CSV, otherwise the CSV
+    # with the same dtypes the snapshot would have given.
+    parquet_file = snapshot_path(table_name, snapshot_dir)
+    csv_file = csv_path(table_name, snapshot_dir)
+    if os.path.exists(parquet_file) and (
+        not os.path.exists(csv_file) or os.path.getmtime(parquet_file) >= os.path.getmtime(csv_file)
+    ):
+        return read_snapshot(table_name, snapshot_dir, columns)
+
+    df = pd.read_csv(csv_file, usecols=columns, float_precision="round_trip")
+    dtypes = {}
+    for column in df.columns:
+        dtypes[column] = "category" if column in CATEGORY_COLUMNS else COLUMN_TYPES[column].to_pandas_dtype()
+    return df.astype(dtypes)
+
+
+def write_all_snapshots(snapshot_dir=OUTPUT_DIR, tables=None):
+    for table_name in tables or TABLES:
+        df = pd.read_csv(csv_path(table_name, snapshot_dir), float_precision="round_trip")
+        path = write_snapshot(table_name, df, snapshot_dir)
+        print(f"✅ {table_name}: {len(df)} rows -> {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write Parquet snapshots of dataframes/*.csv")
+    parser.add_argument("--dir", default=OUTPUT_DIR)
+    parser.add_argument("--tables", nargs="+", choices=list(TABLES), default=None)
+    args = parser.parse_args()
+    write_all_snapshots(args.dir, args.tables)
+
+
+if __name__ == "__main__":
+    main()
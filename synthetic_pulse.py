@@ -0,0 +1,158 @@
+import os
+import json
+import random
+import argparse
+
+from dimensions import STATE_NAMES
+
+# -----------------------------------
+# SYNTHETIC PULSE DATASET
+# Writes a dataset/data-shaped tree of <kind>/country/india/state/
+# <state>/<year>/<quarter>.json files with the same JSON layouts the
+# extractors in pulse_ingestion.py read. Growth is modelled the way the
+# real data grows: more quarters and more districts per state, so
+# --scale N multiplies (quarters x districts) by roughly N.
+# -----------------------------------
+BASE_YEARS = list(range(2018, 2025))
+BASE_DISTRICTS = 20   # real states average about 20
+
+# scale -> (quarter multiplier, district multiplier)
+SCALES = {
+    1: (1, 1),
+    10: (2, 5),
+    100: (4, 25),
+    1000: (10, 100),
+}
+
+TRANSACTION_TYPES = [
+    "Peer-to-peer payments",
+    "Merchant payments",
+    "Recharge & bill payments",
+    "Financial Services",
+    "Others",
+]
+DEVICES = [
+    "Xiaomi", "Samsung", "Vivo", "Oppo", "Realme", "Apple",
+    "OnePlus", "Motorola", "Huawei", "Lenovo", "Others",
+]
+TOP_N = 10
+STATE_ROOT = "country/india/state"
+
+
+def years_for(quarter_multiplier):
+    first = BASE_YEARS[0]
+    return list(range(first, first + len(BASE_YEARS) * quarter_multiplier))
+
+
+def district_names(count):
+    return [f"synthetic {i:04d}" for i in range(1, count + 1)]
+
+
+def metric(rng, scale=1.0):
+    count = int(rng.lognormvariate(9, 1.5) * scale) + 1
+    return count, count * rng.uniform(150, 2500)
+
+
+# -----------------------------------
+# DOCUMENTS (one per state / year / quarter and table kind)
+# -----------------------------------
+def envelope(data):
+    return {"success": True, "code": "SUCCESS", "data": data, "responseTimestamp": 0}
+
+
+def instrument(count, amount):
+    return [{"type": "TOTAL", "count": count, "amount": amount}]
+
+
+def period_documents(rng, districts):
+    per_district = {d: metric(rng) for d in districts}
+    insurance = {d: metric(rng, 0.001) for d in districts}
+    users = {d: int(rng.lognormvariate(10, 1.2)) for d in districts}
+
+    top = sorted(districts, key=lambda d: per_district[d][1], reverse=True)[:TOP_N]
+    top_ins = sorted(districts, key=lambda d: insurance[d][1], reverse=True)[:TOP_N]
+    top_users = sorted(districts, key=lambda d: users[d], reverse=True)[:TOP_N]
+    pincodes = [str(rng.randint(110000, 859999)) for _ in range(TOP_N)]
+
+    device_counts = [int(rng.lognormvariate(10, 1)) for _ in DEVICES]
+    total_devices = sum(device_counts)
+
+    return {
+        "aggregated/transaction": envelope({"transactionData": [
+            {"name": name, "paymentInstruments": instrument(*metric(rng, 10))}
+            for name in TRANSACTION_TYPES
+        ]}),
+        "aggregated/user": envelope({
+            "aggregated": {"registeredUsers": sum(users.values()), "appOpens": 0},
+            "usersByDevice": [
+                {"brand": brand, "count": count, "percentage": count / total_devices}
+                for brand, count in zip(DEVICES, device_counts)
+            ],
+        }),
+        "aggregated/insurance": envelope({"transactionData": [
+            {"name": "Insurance", "paymentInstruments": instrument(*metric(rng, 0.01))}
+        ]}),
+        "map/transaction/hover": envelope({"hoverDataList": [
+            {"name": f"{d} district", "metric": instrument(*per_district[d])} for d in districts
+        ]}),
+        "map/insurance/hover": envelope({"hoverDataList": [
+            {"name": f"{d} district", "metric": instrument(*insurance[d])} for d in districts
+        ]}),
+        "map/user/hover": envelope({"hoverData": {
+            f"{d} district": {"registeredUsers": users[d], "appOpens": 0} for d in districts
+        }}),
+        "top/transaction": envelope({
+            "states": None,
+            "districts": [{"entityName": d, "metric": instrument(*per_district[d])[0]} for d in top],
+            "pincodes": [{"entityName": p, "metric": instrument(*metric(rng))[0]} for p in pincodes],
+        }),
+        "top/insurance": envelope({
+            "states": None,
+            "districts": [{"entityName": d, "metric": instrument(*insurance[d])[0]} for d in top_ins],
+            "pincodes": [{"entityName": p, "metric": instrument(*metric(rng, 0.001))[0]} for p in pincodes],
+        }),
+        "top/user": envelope({
+            "states": None,
+            "districts": [{"name": d, "registeredUsers": users[d]} for d in top_users],
+            "pincodes": [{"name": p, "registeredUsers": int(rng.lognormvariate(9, 1))} for p in pincodes],
+        }),
+    }
+
+
+def generate(output_dir, scale=10, seed=42):
+    if scale not in SCALES:
+        raise ValueError(f"Unknown scale {scale}, expected one of {list(SCALES)}")
+    quarter_multiplier, district_multiplier = SCALES[scale]
+    rng = random.Random(seed)
+    districts = district_names(BASE_DISTRICTS * district_multiplier)
+    years = years_for(quarter_multiplier)
+
+    files = 0
+    for state in STATE_NAMES:
+        for year in years:
+            for quarter in range(1, 5):
+                for kind, doc in period_documents(rng, districts).items():
+                    folder = os.path.join(output_dir, kind, STATE_ROOT, state, str(year))
+                    os.makedirs(folder, exist_ok=True)
+                    with open(os.path.join(folder, f"{quarter}.json"), "w") as f:
+                        json.dump(doc, f, separators=(",", ":"))
+                    files += 1
+
+    print(f"🧪 Wrote {files:,} files ({len(STATE_NAMES)} states, {len(years)} years, "
+          f"{len(districts)} districts per state) -> {output_dir}")
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Pulse-shaped JSON dataset")
+    parser.add_argument("--scale", type=int, choices=list(SCALES), default=10)
+    parser.add_argument("--output-dir", default=None,
+                        help="Default: benchmarks/data/x<scale>")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    generate(args.output_dir or os.path.join("benchmarks", "data", f"x{args.scale}"), args.scale, args.seed)
+
+
+if __name__ == "__main__":
+    main()